@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+In-process benchmark of codeSmellTransactionHandler.apply.
+
+Signed transactions are generated up front, as TpProcessRequests like the
+SDK hands to the handler, and applied against FakeContext. For every
+workload the run reports txns/s, p50/p99 apply latency and, from a second
+pass under tracemalloc, peak memory and the memory blocks still allocated
+after the pass, per transaction. tracemalloc only sees live blocks, so
+blocks allocated and freed during the pass are not counted.
+Results are written as JSON so runs can be compared.
+
+    python3 bench/bench_apply.py --count 5000 --output apply.json
+"""
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+import tracemalloc
+
+import cbor
+
+from sawtooth_signing import CryptoFactory
+from sawtooth_signing import create_context
+from sawtooth_sdk.protobuf.processor_pb2 import TpProcessRequest
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+from fake_context import FakeContext
+from codeSmell_processor.handler import codeSmellTransactionHandler
+from codeSmell_processor.handler import APPROVAL_THRESHOLD_NAME
+
+WORKLOADS = ('create', 'propose', 'vote')
+
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+class TransactionFactory:
+    """Sign code smell transactions with a pool of keys"""
+
+    def __init__(self, signers):
+        context = create_context('secp256k1')
+        factory = CryptoFactory(context)
+        self._signers = [
+            factory.new_signer(context.new_random_private_key())
+            for _ in range(signers)
+        ]
+
+    @property
+    def signers(self):
+        return len(self._signers)
+
+    def create(self, signer, name, value, action):
+        signer = self._signers[signer]
+        public_key = signer.get_public_key().as_hex()
+        payload = cbor.dumps({'action': action, 'name': name, 'value': value})
+        header = TransactionHeader(
+            signer_public_key=public_key,
+            batcher_public_key=public_key,
+            family_name='code-smell',
+            family_version='0.2',
+            payload_sha512=hashlib.sha512(payload).hexdigest(),
+            nonce=hex(random.randint(0, 2**64)))
+        return TpProcessRequest(
+            header=header,
+            payload=payload,
+            signature=signer.sign(header.SerializeToString()))
+
+def build_workload(factory, workload, count):
+    """
+    Transactions that prepare state and the transactions to measure.
+
+    Returns:
+        tuple: (setup transactions, measured transactions)
+    """
+    if workload == 'create':
+        return [], [
+            factory.create(i % factory.signers, "Smell{}".format(i), str(i), 'create')
+            for i in range(count)
+        ]
+
+    if workload == 'propose':
+        setup = [factory.create(0, "Smell{}".format(i), str(i), 'create') for i in range(count)]
+        return setup, [
+            factory.create(i % factory.signers, "Smell{}".format(i), str(i + 1), 'propose')
+            for i in range(count)
+        ]
+
+    #every signer votes once per proposal, open as many proposals as needed
+    proposals = (count + factory.signers - 1) // factory.signers
+    setup = [factory.create(0, APPROVAL_THRESHOLD_NAME, str(factory.signers + 1), 'create')]
+    for p in range(proposals):
+        setup.append(factory.create(0, "Smell{}".format(p), '1', 'create'))
+        setup.append(factory.create(0, "Smell{}".format(p), '2', 'propose'))
+    return setup, [
+        factory.create(i % factory.signers, "Smell{}".format(i // factory.signers), 'accept', 'vote')
+        for i in range(count)
+    ]
+
+def _apply_all(handler, context, transactions):
+    latencies = []
+    for transaction in transactions:
+        start = time.perf_counter()
+        handler.apply(transaction, context)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_workload(factory, workload, count, latency):
+    handler = codeSmellTransactionHandler()
+    setup, transactions = build_workload(factory, workload, count)
+
+    context = FakeContext(latency)
+    _apply_all(handler, context, setup)
+    context.reset_counters()
+
+    start = time.perf_counter()
+    latencies = _apply_all(handler, context, transactions)
+    elapsed = time.perf_counter() - start
+    round_trips = context.round_trips
+
+    #same run again under tracemalloc, it slows everything down
+    context = FakeContext(latency)
+    _apply_all(handler, context, setup)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    _apply_all(handler, context, transactions)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    #blocks retained by the pass, not every allocation it made
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+
+    return {
+        'workload': workload,
+        'transactions': count,
+        'seconds': elapsed,
+        'txns_per_second': count / elapsed,
+        'apply_p50_ms': _percentile(latencies, 50) * 1000,
+        'apply_p99_ms': _percentile(latencies, 99) * 1000,
+        'round_trips_per_txn': round_trips / count,
+        'retained_blocks_per_txn': blocks / count,
+        'peak_kb': peak / 1024.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument('--count', type=int, default=5000,
+                        help='transactions measured per workload')
+    parser.add_argument('--signers', type=int, default=100,
+                        help='size of the signer key pool')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='simulated validator round trip per context call')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    opts = parser.parse_args()
+
+    factory = TransactionFactory(opts.signers)
+    results = {
+        'python': platform.python_version(),
+        'latency_ms': opts.latency_ms,
+        'workloads': [
+            run_workload(factory, workload, opts.count, opts.latency_ms / 1000.0)
+            for workload in opts.workloads
+        ],
+    }
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if opts.output:
+        with open(opts.output, 'w') as fd:
+            fd.write(text + '\n')
+    print(text)
+
+if __name__ == '__main__':
+    main()
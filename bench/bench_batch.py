@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Compare one 'create' transaction per code smell against a single 'batch'
+transaction carrying every code smell.
+
+Each transaction is signed (as the client does) and applied through
+codeSmellTransactionHandler against an in-memory context whose get_state and
+set_state calls cost a configurable round trip.
+
+    python3 bench/bench_batch.py --latency-ms 1
+"""
+
+import time
+import argparse
+
+from sawtooth_signing import CryptoFactory
+from sawtooth_signing import create_context
+
+from fake_context import FakeContext
+from fake_context import FakeTransaction
+from codeSmell_processor.handler import codeSmellTransactionHandler
+
+
+def _run(signer, payloads, latency):
+    handler = codeSmellTransactionHandler()
+    context = FakeContext(latency)
+    public_key = signer.get_public_key().as_hex()
+
+    start = time.perf_counter()
+    for payload in payloads:
+        signer.sign(payload)
+        handler.apply(FakeTransaction(public_key, payload), context)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, context.round_trips
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--latency-ms', type=float, default=1.0,
+                        help='simulated validator round trip per state call')
+    opts = parser.parse_args()
+
+    context = create_context('secp256k1')
+    signer = CryptoFactory(context).new_signer(context.new_random_private_key())
+    latency = opts.latency_ms / 1000.0
+
+    row = "{:>6} {:>8} {:>6} {:>10} {:>10} {:>10} {:>10}"
+    print(row.format('smells', 'path', 'txns', 'state_rt', 'wall_s', 'txns/s', 'smells/s'))
+    for size in opts.sizes:
+        smells = [("Smell{}".format(i), str(i)) for i in range(size)]
+        per_smell = [",".join([name, value, "create"]).encode() for name, value in smells]
+        batch = ["|".join(",".join([name, value, "batch"]) for name, value in smells).encode()]
+
+        for path, payloads in (('create', per_smell), ('batch', batch)):
+            elapsed, round_trips = _run(signer, payloads, latency)
+            print(row.format(size, path, len(payloads), round_trips,
+                             "{:.4f}".format(elapsed),
+                             "{:.0f}".format(len(payloads) / elapsed),
+                             "{:.0f}".format(size / elapsed)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Submit transactions through codeSmellClient to a REST API, comparing
+  fresh:  a new client per transaction, with the key file re-read, the
+          signer rebuilt and a new connection every time (the old
+          load_default behaviour)
+  pooled: one client, cached signer and keep-alive connections
+then time listing every entry back, page by page.
+
+With --fake-rest-api the transactions go to an in-process FakeRestApi,
+no validator or network needed, with its --latency and --page-size.
+
+    python3 bench/bench_client.py --url http://127.0.0.1:8008 --count 300
+    python3 bench/bench_client.py --fake-rest-api --latency 0.001 --page-size 50
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    'client'))
+
+from sawtooth_signing import create_context
+
+import code_smell_client
+from code_smell_client import codeSmellClient
+
+
+def _fresh(url, keyfile, count):
+    for i in range(count):
+        code_smell_client._SIGNERS.clear()
+        with codeSmellClient(base_url=url, keyfile=keyfile) as client:
+            client.create("Smell{}".format(i), str(i), "create")
+
+def _pooled(url, keyfile, count):
+    with codeSmellClient(base_url=url, keyfile=keyfile) as client:
+        for i in range(count):
+            client.create("Smell{}".format(i), str(i), "create")
+
+def _list(url, limit):
+    """Returns the number of entries and of pages listed"""
+    with codeSmellClient(base_url=url) as client:
+        requests = []
+        send_request = client._send_request
+
+        def _counted(suffix, *args, **kwargs):
+            requests.append(suffix)
+            return send_request(suffix, *args, **kwargs)
+
+        client._send_request = _counted
+        return sum(1 for _ in client.list(limit=limit)), len(requests)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8008')
+    parser.add_argument('--count', type=int, default=300)
+    parser.add_argument('--limit', type=int, default=100,
+                        help='entries asked for per list page')
+    parser.add_argument('--fake-rest-api', action='store_true',
+                        help='run against an in-process FakeRestApi')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='FakeRestApi seconds of delay per request')
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help='FakeRestApi largest state page')
+    opts = parser.parse_args()
+
+    api = None
+    if opts.fake_rest_api:
+        from fake_rest_api import FakeRestApi
+        api = FakeRestApi(port=0, latency=opts.latency, page_size=opts.page_size).start()
+        opts.url = api.url
+
+    with tempfile.NamedTemporaryFile('w', suffix='.priv', delete=False) as fd:
+        fd.write(create_context('secp256k1').new_random_private_key().as_hex())
+        keyfile = fd.name
+
+    try:
+        row = "{:>8} {:>6} {:>10} {:>10}"
+        print(row.format('mode', 'txns', 'wall_s', 'txns/s'))
+        for mode, run in (('fresh', _fresh), ('pooled', _pooled)):
+            start = time.perf_counter()
+            run(opts.url, keyfile, opts.count)
+            elapsed = time.perf_counter() - start
+            print(row.format(mode, opts.count, "{:.2f}".format(elapsed),
+                             "{:.0f}".format(opts.count / elapsed)))
+
+        start = time.perf_counter()
+        entries, pages = _list(opts.url, opts.limit)
+        elapsed = time.perf_counter() - start
+        print("listed {} entries in {} pages, {:.2f}s".format(entries, pages, elapsed))
+    finally:
+        os.remove(keyfile)
+        if api is not None:
+            api.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Micro benchmark of codeSmellPayload parse cost per payload for the csv
+(family version 0.1) and cbor (family version 0.2) encodings.
+
+    python3 bench/bench_payload.py --number 100000
+"""
+
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    'processor'))
+
+import cbor
+
+from codeSmell_processor.codeSmell_payload import codeSmellPayload
+from codeSmell_processor.codeSmell_payload import FAMILY_VERSION_CSV
+from codeSmell_processor.codeSmell_payload import FAMILY_VERSION_CBOR
+
+
+def _payloads(batch_size):
+    smells = [("LargeClass{}".format(i), str(500 + i)) for i in range(batch_size)]
+    if batch_size == 1:
+        name, value = smells[0]
+        return {
+            FAMILY_VERSION_CSV: ",".join([name, value, "create"]).encode(),
+            FAMILY_VERSION_CBOR: cbor.dumps({'action': 'create', 'name': name, 'value': value}),
+        }
+    return {
+        FAMILY_VERSION_CSV: "|".join(
+            ",".join([name, value, "batch"]) for name, value in smells).encode(),
+        FAMILY_VERSION_CBOR: cbor.dumps(
+            {'action': 'batch', 'entries': [[name, value] for name, value in smells]}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=100000,
+                        help='payloads parsed per measurement')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100])
+    opts = parser.parse_args()
+
+    row = "{:>6} {:>8} {:>8} {:>12}"
+    print(row.format('smells', 'version', 'bytes', 'us/payload'))
+    for batch_size in opts.batch_sizes:
+        number = max(1, opts.number // batch_size)
+        for family_version, payload in sorted(_payloads(batch_size).items()):
+            elapsed = timeit.timeit(
+                lambda: codeSmellPayload.from_bytes(payload, family_version),
+                number=number)
+            print(row.format(batch_size, family_version, len(payload),
+                             "{:.2f}".format(elapsed / number * 1e6)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Build and sign BatchLists for a bulk load with codeSmellClient, nothing is
+sent. Signing runs in-process (serial) and then on a codeSmellSigningPool
+of 1, 2, 4... workers, up to one per core, reporting signatures/s.
+
+    python3 bench/bench_signing.py --count 20000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    'client'))
+
+from sawtooth_signing import create_context
+
+from code_smell_client import codeSmellClient
+from code_smell_signing import codeSmellSigningPool
+
+
+def _sign_all(client, count, txns_per_batch, signing_pool=None):
+    """Returns the number of signatures made"""
+    smells = (("Smell{}".format(i), str(i)) for i in range(count))
+    signatures = 0
+    for batch_list in client._iter_batch_lists(
+            smells, txns_per_batch, 100, 1, signing_pool):
+        signatures += len(batch_list) + sum(len(b.transactions) for b in batch_list)
+    return signatures
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--txns-per-batch', type=int, default=100)
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    opts = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.priv', delete=False) as fd:
+        fd.write(create_context('secp256k1').new_random_private_key().as_hex())
+        keyfile = fd.name
+
+    try:
+        client = codeSmellClient(base_url='http://127.0.0.1:8008', keyfile=keyfile)
+
+        workers = [None]
+        count = 1
+        while count <= opts.max_workers:
+            workers.append(count)
+            count *= 2
+
+        row = "{:>8} {:>8} {:>10} {:>10} {:>8}"
+        print(row.format('workers', 'sigs', 'wall_s', 'sigs/s', 'speedup'))
+        baseline = None
+        for count in workers:
+            if count is None:
+                pool = None
+            else:
+                pool = codeSmellSigningPool(keyfile, count)
+            try:
+                start = time.perf_counter()
+                signatures = _sign_all(client, opts.count, opts.txns_per_batch, pool)
+                elapsed = time.perf_counter() - start
+            finally:
+                if pool is not None:
+                    pool.close()
+
+            rate = signatures / elapsed
+            baseline = baseline or rate
+            print(row.format(count or 'serial', signatures, "{:.2f}".format(elapsed),
+                             "{:.0f}".format(rate), "{:.2f}x".format(rate / baseline)))
+    finally:
+        os.remove(keyfile)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Measure code_smell CLI startup: wall time and total import time (from
+python -X importtime) of `code_smell --help` and `code_smell list`, the
+median of --runs runs each. list is pointed at a closed port so it fails
+right after its imports. Exits 1 when an import time is over its budget.
+
+    python3 bench/bench_startup.py --runs 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+CLI = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    'client', 'code_smell.py')
+
+#import time budgets, in milliseconds, update them along with the CLI
+BUDGETS_MS = {
+    'help': 100,
+    'list': 400,
+}
+
+COMMANDS = {
+    'help': ['--help'],
+    'list': ['list', '--url', 'http://127.0.0.1:9'],
+}
+
+def _import_ms(stderr):
+    """Sum the cumulative time of the top level imports of a -X importtime log"""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        #nested imports are indented further, the header is not a number
+        if cumulative.strip().isdigit() and not name.startswith('  '):
+            total += int(cumulative)
+    return total / 1000.0
+
+def _run(args):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', CLI] + args,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True)
+    return (time.perf_counter() - start) * 1000.0, _import_ms(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    opts = parser.parse_args()
+
+    row = "{:>8} {:>10} {:>10} {:>10}  {}"
+    print(row.format('command', 'wall_ms', 'import_ms', 'budget_ms', ''))
+    over = False
+    for command, args in COMMANDS.items():
+        runs = [_run(args) for _ in range(opts.runs)]
+        wall = statistics.median(r[0] for r in runs)
+        imports = statistics.median(r[1] for r in runs)
+        status = 'ok' if imports <= BUDGETS_MS[command] else 'OVER'
+        over = over or status == 'OVER'
+        print(row.format(command, "{:.1f}".format(wall), "{:.1f}".format(imports),
+                         BUDGETS_MS[command], status))
+
+    sys.exit(1 if over else 0)
+
+if __name__ == '__main__':
+    main()
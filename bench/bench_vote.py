@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Per vote cost as the number of voters on one proposal grows.
+
+One proposal stays open (ApprovalThreshold is set above the voter count)
+while distinct peers vote on it; cost, state round trips and state bytes are
+reported for each window of votes and should stay flat.
+
+    python3 bench/bench_vote.py --voters 10000
+"""
+
+import time
+import argparse
+
+from fake_context import FakeContext
+from fake_context import FakeTransaction
+from codeSmell_processor.handler import codeSmellTransactionHandler
+from codeSmell_processor.handler import APPROVAL_THRESHOLD_NAME
+
+
+def _apply(handler, context, signer, payload):
+    handler.apply(FakeTransaction(signer, payload.encode()), context)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=10000)
+    parser.add_argument('--checkpoints', type=int, nargs='+',
+                        default=[10, 100, 1000, 10000])
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='simulated validator round trip per state call')
+    opts = parser.parse_args()
+
+    handler = codeSmellTransactionHandler()
+    context = FakeContext(opts.latency_ms / 1000.0)
+    proposer = '02' + '11' * 32
+
+    row = "{:>8} {:>12} {:>10} {:>12}"
+    print(row.format('voters', 'us/vote', 'rt/vote', 'bytes/vote'))
+    _apply(handler, context, proposer, "LargeClass,500,create")
+    _apply(handler, context, proposer,
+           "{},{},create".format(APPROVAL_THRESHOLD_NAME, opts.voters + 1))
+    _apply(handler, context, proposer, "LargeClass,600,propose")
+
+    voted = 0
+    for checkpoint in sorted(c for c in opts.checkpoints if c <= opts.voters):
+        context.reset_counters()
+        votes = checkpoint - voted
+        start = time.perf_counter()
+        for voter in range(voted, checkpoint):
+            _apply(handler, context, '03{:064x}'.format(voter), "LargeClass,accept,vote")
+        elapsed = time.perf_counter() - start
+        voted = checkpoint
+        print(row.format(
+            checkpoint,
+            "{:.1f}".format(elapsed / votes * 1e6),
+            "{:.1f}".format(context.round_trips / votes),
+            "{:.0f}".format((context.bytes_read + context.bytes_written) / votes)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Throughput of `codesmell-tp --workers N` against the local stand in
+validator, for each N in --workers.
+
+    python3 bench/bench_workers.py --workers 1 2 4 8 --count 20000
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+
+from fake_validator import summarize
+from fake_validator import FakeValidator
+from fake_validator import make_process_request
+
+TP = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    'bin', 'codesmell-tp')
+
+
+def _measure(workers, count, names, endpoint):
+    validator = FakeValidator(endpoint)
+    tp = subprocess.Popen(
+        [sys.executable, TP, '-C', endpoint, '--workers', str(workers)],
+        stdout=subprocess.DEVNULL)
+    try:
+        validator.wait_for_processors(workers)
+        requests = (
+            make_process_request("Smell{}".format(i % names), str(i))
+            for i in range(count))
+        start = time.perf_counter()
+        results = validator.process(requests, timeout=600)
+        summary = summarize(results, time.perf_counter() - start)
+    finally:
+        tp.send_signal(signal.SIGTERM)
+        try:
+            tp.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            tp.kill()
+        validator.close()
+
+    return summary
+
+def _latency(value):
+    return '-' if value is None else "{:.2f}".format(value)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--names', type=int, default=100)
+    parser.add_argument('--port', type=int, default=14004,
+                        help='first port, each run binds the next one')
+    opts = parser.parse_args()
+
+    row = "{:>7} {:>8} {:>8} {:>10} {:>10} {:>10} {:>10}"
+    print(row.format('workers', 'txns', 'ok', 'wall_s', 'txns/s', 'p50_ms', 'p99_ms'))
+    for index, workers in enumerate(opts.workers):
+        endpoint = 'tcp://127.0.0.1:{}'.format(opts.port + index)
+        summary = _measure(workers, opts.count, opts.names, endpoint)
+        print(row.format(workers, summary['transactions'], summary['ok'],
+                         "{:.2f}".format(summary['seconds']),
+                         "{:.0f}".format(summary['txns_per_second']),
+                         _latency(summary['latency_p50_ms']),
+                         _latency(summary['latency_p99_ms'])))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Check that AsyncCodeSmellClient.create builds the transaction it is asked
+for: each action, in each family version, is decoded by the processor's
+codeSmellPayload and must come back with the same action, name and value
+and declare the addresses codeSmellClient declares. Nothing is sent.
+Exits 1 on a mismatch.
+
+    python3 bench/check_async_payloads.py
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    'client'))
+
+from sawtooth_signing import create_context
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+#puts the processor on the path
+import fake_context  # pylint: disable=unused-import
+from codeSmell_processor.codeSmell_payload import codeSmellPayload
+
+from code_smell_async_client import AsyncCodeSmellClient
+from code_smell_client import FAMILY_VERSION_CSV
+from code_smell_client import FAMILY_VERSION_CBOR
+
+CASES = (
+    ('create', 'LargeClass', '500'),
+    ('propose', 'LargeClass', '600'),
+    ('vote', 'LargeClass', 'accept'),
+    ('vote', 'LargeClass', 'reject'),
+)
+
+async def _check(keyfile, family_version):
+    failures = 0
+    async with AsyncCodeSmellClient(
+            base_url='http://127.0.0.1:8008',
+            keyfile=keyfile,
+            family_version=family_version,
+            validate=False) as client:
+        for action, name, value in CASES:
+            batch_list = client._build_single(name, value, action)
+            transaction = batch_list.batches[0].transactions[0]
+            header = TransactionHeader.FromString(transaction.header)
+            payload = codeSmellPayload.from_bytes(
+                transaction.payload, family_version=header.family_version)
+
+            got = (payload.action, payload.name, payload.value, list(header.outputs))
+            expected = (action, name, value, client._builder._get_addresses(name, action))
+            status = 'ok' if got == expected else 'FAIL'
+            failures += status == 'FAIL'
+            print("{:4} {:8} {:8} {}".format(family_version, action, value, status))
+    return failures
+
+def main():
+    with tempfile.NamedTemporaryFile('w', suffix='.priv', delete=False) as fd:
+        fd.write(create_context('secp256k1').new_random_private_key().as_hex())
+        keyfile = fd.name
+
+    try:
+        failures = sum(asyncio.run(_check(keyfile, family_version))
+                       for family_version in (FAMILY_VERSION_CSV, FAMILY_VERSION_CBOR))
+    finally:
+        os.remove(keyfile)
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
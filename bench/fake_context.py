@@ -0,0 +1,95 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+In-memory stand ins for the objects the SDK hands to
+codeSmellTransactionHandler.apply.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    'processor'))
+
+
+class FakeHeader:
+    def __init__(self, signer_public_key, family_version='0.1'):
+        self.signer_public_key = signer_public_key
+        self.family_version = family_version
+
+class FakeTransaction:
+    def __init__(self, signer_public_key, payload, family_version='0.1'):
+        self.header = FakeHeader(signer_public_key, family_version)
+        self.payload = payload
+
+class FakeStateEntry:
+    def __init__(self, address, data):
+        self.address = address
+        self.data = data
+
+class FakeContext:
+    """dict backed stand in for sawtooth_sdk.processor.context.Context
+
+    Every call sleeps latency seconds to model the validator round trip and
+    is counted, along with the bytes read and written.
+    """
+
+    def __init__(self, latency=0.0, state=None):
+        self._latency = latency
+        self.state = {} if state is None else state
+        self.round_trips = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.events = []
+
+    def get_state(self, addresses, timeout=None):
+        self._round_trip()
+        entries = [
+            FakeStateEntry(address, self.state[address])
+            for address in addresses if address in self.state
+        ]
+        self.bytes_read += sum(len(entry.data) for entry in entries)
+        return entries
+
+    def set_state(self, entries, timeout=None):
+        self._round_trip()
+        self.state.update(entries)
+        self.bytes_written += sum(len(data) for data in entries.values())
+        return list(entries)
+
+    def delete_state(self, addresses, timeout=None):
+        self._round_trip()
+        deleted = [address for address in addresses if address in self.state]
+        for address in deleted:
+            del self.state[address]
+        return deleted
+
+    def add_event(self, event_type, attributes=None, data=None, timeout=None):
+        self._round_trip()
+        self.events.append((event_type, attributes or [], data))
+
+    def reset_counters(self):
+        self.round_trips = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.events = []
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self._latency:
+            time.sleep(self._latency)
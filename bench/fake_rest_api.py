@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Local stand in for sawtooth-rest-api, for benchmarking the client offline.
+
+Serves the endpoints the client uses: POST /batches, GET and POST
+/batch_status (with wait), GET /state (with paging), GET /state/{address}
+and GET /blocks. Submitted batches are queued and a committer thread
+applies them, every block_interval seconds, with the real
+codeSmellTransactionHandler against in-memory state. A batch commits
+atomically, or is INVALID with the state it wrote discarded.
+
+Each request can be delayed by latency seconds, /batches answers 429 for
+throttle_rate of requests or while max_queue batches are queued, and
+state pages are capped at page_size entries. Signatures are not checked
+and state is only kept at the head, so the head parameter is ignored.
+
+    python3 bench/fake_rest_api.py --port 8008 --latency 0.002 --page-size 100
+"""
+
+import json
+import time
+import uuid
+import base64
+import bisect
+import random
+import logging
+import argparse
+import threading
+
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from sawtooth_sdk.processor.exceptions import InternalError
+from sawtooth_sdk.processor.exceptions import InvalidTransaction
+from sawtooth_sdk.protobuf.batch_pb2 import BatchList
+from sawtooth_sdk.protobuf.processor_pb2 import TpProcessRequest
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+from fake_context import FakeContext
+from fake_context import FakeStateEntry
+from codeSmell_processor.handler import codeSmellTransactionHandler
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 1000
+MAX_BATCHES_PER_BLOCK = 100
+
+
+class _OverlayContext(FakeContext):
+    """FakeContext writing to an overlay of state, merged on commit"""
+
+    def __init__(self, state):
+        super().__init__(state={})
+        self._base = state
+        self._deleted = set()
+
+    def get_state(self, addresses, timeout=None):
+        return [
+            FakeStateEntry(address, data) for address, data in
+            ((address, self._read(address)) for address in addresses)
+            if data is not None
+        ]
+
+    def delete_state(self, addresses, timeout=None):
+        deleted = [address for address in addresses if self._read(address) is not None]
+        for address in deleted:
+            self.state.pop(address, None)
+            self._deleted.add(address)
+        return deleted
+
+    def set_state(self, entries, timeout=None):
+        self._deleted.difference_update(entries)
+        return super().set_state(entries, timeout)
+
+    def commit(self):
+        for address in self._deleted:
+            self._base.pop(address, None)
+        self._base.update(self.state)
+
+    def _read(self, address):
+        if address in self.state:
+            return self.state[address]
+        if address in self._deleted:
+            return None
+        return self._base.get(address)
+
+
+class FakeRestApi:
+    """In-memory REST API with a committer thread"""
+
+    def __init__(self,
+                 host='127.0.0.1',
+                 port=8008,
+                 latency=0.0,
+                 throttle_rate=0.0,
+                 max_queue=None,
+                 page_size=MAX_PAGE_SIZE,
+                 block_interval=0.0):
+        """Constructor
+
+        Args:
+            host (str): address to listen on
+            port (int): port to listen on, 0 picks a free one
+            latency (float): seconds every request is delayed
+            throttle_rate (float): fraction of /batches requests answered 429
+            max_queue (int): queued batches over which /batches answers 429
+            page_size (int): most state entries in one page
+            block_interval (float): seconds between blocks, 0 commits
+                batches as soon as they are queued
+        """
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.max_queue = max_queue
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        self.block_interval = block_interval
+
+        #written by committed batches only, with a sorted index of its
+        #addresses for paging
+        self.state = {}
+        self._addresses = []
+        self.blocks = [self._block([], None)]
+        self._handler = codeSmellTransactionHandler()
+        self._queue = []
+        self._statuses = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+
+        self.requests = 0
+        self.throttled = 0
+
+        api = self
+
+        class _RequestHandler(_FakeRestApiHandler):
+            rest_api = api
+
+        self._server = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._server.daemon_threads = True
+        self._threads = []
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    @property
+    def head(self):
+        return self.blocks[-1]['header_signature']
+
+    def start(self):
+        """Serve and commit on background threads"""
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+            threading.Thread(target=self._commit_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def submit(self, data):
+        """
+        Queue the batches of a serialized BatchList.
+
+        Returns:
+            tuple: HTTP status and JSON response
+        """
+        if self.throttle_rate and random.random() < self.throttle_rate:
+            return 429, _error(31, 'Too Many Requests', 'Injected throttle')
+
+        try:
+            batches = list(BatchList.FromString(data).batches)
+        except Exception:  # pylint: disable=broad-except
+            return 400, _error(35, 'Submitted Batches Invalid', 'Unparsable BatchList')
+        if not batches:
+            return 400, _error(34, 'No Batches Submitted', 'Empty BatchList')
+
+        with self._condition:
+            if self.max_queue is not None and len(self._queue) + len(batches) > self.max_queue:
+                return 429, _error(31, 'Too Many Requests', 'Batch queue is full')
+            for batch in batches:
+                if batch.header_signature not in self._statuses:
+                    self._statuses[batch.header_signature] = ('PENDING', [])
+                    self._queue.append(batch)
+            self._condition.notify_all()
+
+        ids = ','.join(batch.header_signature for batch in batches)
+        return 202, {'link': '/batch_status?id={}'.format(ids)}
+
+    def batch_statuses(self, batch_ids, wait=None):
+        """Status of every batch, waiting up to wait seconds for all to be final"""
+        deadline = time.time() + (wait or 0)
+        with self._condition:
+            while wait and time.time() < deadline and any(
+                    self._statuses.get(b, ('UNKNOWN',))[0] == 'PENDING' for b in batch_ids):
+                self._condition.wait(deadline - time.time())
+            return [
+                {'id': batch_id,
+                 'status': self._statuses.get(batch_id, ('UNKNOWN', []))[0],
+                 'invalid_transactions': self._statuses.get(batch_id, ('UNKNOWN', []))[1]}
+                for batch_id in batch_ids
+            ]
+
+    def _commit_loop(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+            if self.block_interval:
+                time.sleep(self.block_interval)
+
+            with self._condition:
+                batches = self._queue[:MAX_BATCHES_PER_BLOCK]
+                del self._queue[:MAX_BATCHES_PER_BLOCK]
+
+            committed = []
+            results = {}
+            for batch in batches:
+                invalid = self._apply(batch)
+                results[batch.header_signature] = invalid
+                if not invalid:
+                    committed.append(batch)
+
+            with self._condition:
+                if committed:
+                    self.blocks.append(self._block(committed, self.head))
+                for batch_id, invalid in results.items():
+                    self._statuses[batch_id] = ('INVALID', invalid) if invalid else \
+                        ('COMMITTED', [])
+                self._condition.notify_all()
+
+    def _apply(self, batch):
+        """Apply a batch atomically, returning its invalid transactions"""
+        context = _OverlayContext(self.state)
+        for transaction in batch.transactions:
+            request = TpProcessRequest(
+                header=TransactionHeader.FromString(transaction.header),
+                payload=transaction.payload,
+                signature=transaction.header_signature)
+            try:
+                self._handler.apply(request, context)
+            except (InvalidTransaction, InternalError) as err:
+                return [{'id': transaction.header_signature, 'message': str(err)}]
+
+        with self._condition:
+            added = [a for a in context.state if a not in self.state]
+            removed = [a for a in context._deleted if a in self.state]
+            context.commit()
+            for address in added:
+                bisect.insort(self._addresses, address)
+            for address in removed:
+                del self._addresses[bisect.bisect_left(self._addresses, address)]
+        return []
+
+    @staticmethod
+    def _block(batches, previous_block_id):
+        return {
+            'header_signature': uuid.uuid4().hex * 2,
+            'header': {'previous_block_id': previous_block_id or '0' * 128},
+            'batches': [{
+                'header_signature': batch.header_signature,
+                'transactions': [{
+                    'header_signature': transaction.header_signature,
+                    'header': {
+                        'outputs': list(
+                            TransactionHeader.FromString(transaction.header).outputs),
+                    },
+                } for transaction in batch.transactions],
+            } for batch in batches],
+        }
+
+def _error(code, title, message):
+    return {'error': {'code': code, 'title': title, 'message': message}}
+
+
+class _FakeRestApiHandler(BaseHTTPRequestHandler):
+    """Routes requests to rest_api, set by FakeRestApi on a subclass"""
+
+    protocol_version = 'HTTP/1.1'
+    rest_api = None
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+    def log_message(self, format, *args):
+        LOGGER.debug(format, *args)
+
+    def _route(self, method):
+        api = self.rest_api
+        api.requests += 1
+        if api.latency:
+            time.sleep(api.latency)
+
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+
+        if method == 'POST' and url.path == '/batches':
+            status, response = api.submit(body)
+            if status == 429:
+                api.throttled += 1
+        elif url.path == '/batch_status':
+            if method == 'POST':
+                batch_ids = json.loads(body.decode())
+            else:
+                batch_ids = [b for b in query.get('id', '').split(',') if b]
+            if not batch_ids:
+                status, response = 400, _error(66, 'Id Query Invalid or Missing', 'No ids')
+            else:
+                wait = int(query['wait']) if query.get('wait') else None
+                status, response = 200, {'data': api.batch_statuses(batch_ids, wait)}
+        elif method == 'GET' and url.path == '/state':
+            status, response = self._state_page(query)
+        elif method == 'GET' and url.path.startswith('/state/'):
+            address = url.path[len('/state/'):]
+            with api._condition:
+                data = api.state.get(address)
+                head = api.head
+            if data is None:
+                status, response = 404, _error(75, 'State Not Found', address)
+            else:
+                status, response = 200, {
+                    'data': base64.b64encode(data).decode(), 'head': head, 'link': self.path}
+        elif method == 'GET' and url.path == '/blocks':
+            status, response = self._blocks_page(query)
+        else:
+            status, response = 404, _error(0, 'Not Found', url.path)
+
+        self._send(status, response)
+
+    def _state_page(self, query):
+        api = self.rest_api
+        prefix = query.get('address', '')
+        limit = min(int(query.get('limit', MAX_PAGE_SIZE)), api.page_size)
+        start = query.get('start')
+
+        with api._condition:
+            index = api._addresses
+            i = bisect.bisect_left(index, max(prefix, start or ''))
+            page = []
+            while i < len(index) and len(page) <= limit and index[i].startswith(prefix):
+                page.append((index[i], api.state[index[i]]))
+                i += 1
+            head = api.head
+
+        paging = {'limit': limit}
+        if start is not None:
+            paging['start'] = start
+        if len(page) > limit:
+            paging['next_position'] = page[limit][0]
+            paging['next'] = '{}/state?address={}&limit={}&start={}'.format(
+                api.url, prefix, limit, page[limit][0])
+            page = page[:limit]
+
+        return 200, {
+            'data': [{'address': a, 'data': base64.b64encode(d).decode()} for a, d in page],
+            'head': head,
+            'link': self.path,
+            'paging': paging,
+        }
+
+    def _blocks_page(self, query):
+        api = self.rest_api
+        limit = min(int(query.get('limit', 100)), MAX_PAGE_SIZE)
+
+        with api._condition:
+            #newest first, from head, or the given block, down to genesis
+            blocks = list(reversed(api.blocks))
+            ids = [block['header_signature'] for block in blocks]
+            first = query.get('start') or query.get('head')
+            if first is not None:
+                if first not in ids:
+                    return 404, _error(70, 'Block Not Found', first)
+                blocks = blocks[ids.index(first):]
+            head = api.head
+
+        paging = {'limit': limit}
+        if len(blocks) > limit:
+            paging['next_position'] = blocks[limit]['header_signature']
+        return 200, {'data': blocks[:limit], 'head': head, 'link': self.path, 'paging': paging}
+
+    def _send(self, status, response):
+        body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8008)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds every request is delayed')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='fraction of /batches requests answered 429')
+    parser.add_argument('--max-queue', type=int,
+                        help='queued batches over which /batches answers 429')
+    parser.add_argument('--page-size', type=int, default=MAX_PAGE_SIZE,
+                        help='most state entries in one page')
+    parser.add_argument('--block-interval', type=float, default=0.0,
+                        help='seconds between blocks')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    opts = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if opts.verbose else logging.INFO)
+
+    api = FakeRestApi(
+        host=opts.host,
+        port=opts.port,
+        latency=opts.latency,
+        throttle_rate=opts.throttle_rate,
+        max_queue=opts.max_queue,
+        page_size=opts.page_size,
+        block_interval=opts.block_interval)
+    api.start()
+    LOGGER.info("Serving a fake REST API on %s", api.url)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        api.stop()
+
+if __name__ == '__main__':
+    main()
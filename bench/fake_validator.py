@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Local stand in for the validator component endpoint.
+
+Speaks enough of the component protocol for a real TransactionProcessor to
+register, receive TpProcessRequests, read, write and delete state, which
+lives in a dict, and add events. Transactions are dispatched round robin
+between the registered processors, keeping at most max_occupancy requests in
+flight per processor, optionally paced at a target rate.
+
+Start it, then the processor, and it reports end to end throughput and
+latency of the processor, ZMQ message loop included:
+
+    python3 bench/fake_validator.py --count 20000 --rate 2000 &
+    bin/codesmell-tp -C tcp://localhost:4004
+"""
+
+import json
+import time
+import uuid
+import random
+import logging
+import argparse
+
+import cbor
+import zmq
+
+from sawtooth_sdk.protobuf.validator_pb2 import Message
+from sawtooth_sdk.protobuf.processor_pb2 import TpRegisterRequest
+from sawtooth_sdk.protobuf.processor_pb2 import TpRegisterResponse
+from sawtooth_sdk.protobuf.processor_pb2 import TpUnregisterResponse
+from sawtooth_sdk.protobuf.processor_pb2 import TpProcessRequest
+from sawtooth_sdk.protobuf.processor_pb2 import TpProcessResponse
+from sawtooth_sdk.protobuf.state_context_pb2 import TpStateEntry
+from sawtooth_sdk.protobuf.state_context_pb2 import TpStateGetRequest
+from sawtooth_sdk.protobuf.state_context_pb2 import TpStateGetResponse
+from sawtooth_sdk.protobuf.state_context_pb2 import TpStateSetRequest
+from sawtooth_sdk.protobuf.state_context_pb2 import TpStateSetResponse
+from sawtooth_sdk.protobuf.state_context_pb2 import TpStateDeleteRequest
+from sawtooth_sdk.protobuf.state_context_pb2 import TpStateDeleteResponse
+from sawtooth_sdk.protobuf.state_context_pb2 import TpEventAddResponse
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+LOGGER = logging.getLogger(__name__)
+
+FAMILY_NAME = 'code-smell'
+FAMILY_VERSION = '0.2'
+DEFAULT_ENDPOINT = 'tcp://localhost:4004'
+DEFAULT_MAX_OCCUPANCY = 10
+
+
+def make_process_request(name, value, action='create', context_id=None):
+    """Build a TpProcessRequest for a cbor encoded code smell payload"""
+    payload = cbor.dumps({'action': action, 'name': name, 'value': value})
+    header = TransactionHeader(
+        signer_public_key='02' + '00' * 32,
+        family_name=FAMILY_NAME,
+        family_version=FAMILY_VERSION,
+        nonce=hex(random.randint(0, 2**64)))
+    return TpProcessRequest(
+        header=header,
+        payload=payload,
+        signature=uuid.uuid4().hex,
+        context_id=context_id or uuid.uuid4().hex)
+
+class FakeValidator:
+    """Dict backed validator component endpoint"""
+
+    def __init__(self, endpoint=DEFAULT_ENDPOINT):
+        self._zmq_context = zmq.Context.instance()
+        self._socket = self._zmq_context.socket(zmq.ROUTER)
+        self._socket.setsockopt(zmq.LINGER, 0)
+        #zmq binds to interfaces or addresses, not host names
+        self._socket.bind(endpoint.replace('//localhost:', '//127.0.0.1:'))
+
+        self.state = {}
+        self._processors = []
+        self._occupancy = {}
+        self._next_processor = 0
+        self._in_flight = {}
+        self.results = {}
+        self.events = 0
+
+    @property
+    def processors(self):
+        return len(self._processors)
+
+    def close(self):
+        self._socket.close()
+
+    def wait_for_processors(self, count, timeout=30):
+        """Serve registrations until count processors are registered"""
+        deadline = time.time() + timeout
+        while len(self._processors) < count:
+            if time.time() > deadline:
+                raise TimeoutError(
+                    "{} of {} processors registered".format(len(self._processors), count))
+            self._poll(100)
+
+    def process(self, requests, timeout=60, rate=0):
+        """Dispatch every request and wait for all responses
+
+        Args:
+            requests (iterable): TpProcessRequest to send
+            timeout (float): seconds allowed for the whole run
+            rate (float): target requests per second, 0 sends as fast as
+                the processors take them
+
+        Returns:
+            list: (status, latency) per request. With a rate the latency is
+                measured from the time the request was scheduled, so time
+                spent waiting for a free processor slot is included.
+        """
+        pending = iter(requests)
+        self.results = {}
+        exhausted = False
+        start = time.perf_counter()
+        deadline = start + timeout
+        interval = 1.0 / rate if rate else 0
+        sent = 0
+
+        while not exhausted or self._in_flight:
+            now = time.perf_counter()
+            if now > deadline:
+                raise TimeoutError(
+                    "{} requests still in flight".format(len(self._in_flight)))
+
+            while not exhausted and self._has_capacity():
+                scheduled = start + sent * interval
+                if scheduled > now:
+                    break
+                request = next(pending, None)
+                if request is None:
+                    exhausted = True
+                    break
+                self._dispatch(request, scheduled if interval else None)
+                sent += 1
+
+            wait = 0.1
+            if interval and not exhausted and self._has_capacity():
+                wait = start + sent * interval - time.perf_counter()
+            self._poll(max(1, min(100, int(wait * 1000))))
+
+        return list(self.results.values())
+
+    def _has_capacity(self):
+        return any(
+            self._occupancy[identity] < max_occupancy
+            for identity, max_occupancy in self._processors)
+
+    def _dispatch(self, request, scheduled=None):
+        for _ in range(len(self._processors)):
+            identity, max_occupancy = self._processors[self._next_processor]
+            self._next_processor = (self._next_processor + 1) % len(self._processors)
+            if self._occupancy[identity] < max_occupancy:
+                break
+
+        correlation_id = uuid.uuid4().hex
+        self._occupancy[identity] += 1
+        self._in_flight[correlation_id] = (identity, scheduled or time.perf_counter())
+        self._send(identity, Message.TP_PROCESS_REQUEST, request, correlation_id)
+
+    def _send(self, identity, message_type, content, correlation_id):
+        message = Message(
+            message_type=message_type,
+            correlation_id=correlation_id,
+            content=content.SerializeToString())
+        self._socket.send_multipart([identity, message.SerializeToString()])
+
+    def _poll(self, timeout_ms):
+        if not self._socket.poll(timeout_ms):
+            return
+        while True:
+            try:
+                identity, data = self._socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            message = Message()
+            message.ParseFromString(data)
+            self._handle(identity, message)
+
+    def _handle(self, identity, message):
+        if message.message_type == Message.TP_REGISTER_REQUEST:
+            request = TpRegisterRequest()
+            request.ParseFromString(message.content)
+            if request.family == FAMILY_NAME and identity not in self._occupancy:
+                max_occupancy = request.max_occupancy or DEFAULT_MAX_OCCUPANCY
+                self._processors.append((identity, max_occupancy))
+                self._occupancy[identity] = 0
+                LOGGER.info("Registered processor %s", identity)
+            self._send(identity, Message.TP_REGISTER_RESPONSE,
+                       TpRegisterResponse(status=TpRegisterResponse.OK),
+                       message.correlation_id)
+
+        elif message.message_type == Message.TP_UNREGISTER_REQUEST:
+            self._processors = [p for p in self._processors if p[0] != identity]
+            self._send(identity, Message.TP_UNREGISTER_RESPONSE,
+                       TpUnregisterResponse(status=TpUnregisterResponse.OK),
+                       message.correlation_id)
+
+        elif message.message_type == Message.TP_STATE_GET_REQUEST:
+            request = TpStateGetRequest()
+            request.ParseFromString(message.content)
+            entries = [
+                TpStateEntry(address=address, data=self.state[address])
+                for address in request.addresses if address in self.state
+            ]
+            self._send(identity, Message.TP_STATE_GET_RESPONSE,
+                       TpStateGetResponse(entries=entries, status=TpStateGetResponse.OK),
+                       message.correlation_id)
+
+        elif message.message_type == Message.TP_STATE_SET_REQUEST:
+            request = TpStateSetRequest()
+            request.ParseFromString(message.content)
+            for entry in request.entries:
+                self.state[entry.address] = entry.data
+            self._send(identity, Message.TP_STATE_SET_RESPONSE,
+                       TpStateSetResponse(
+                           addresses=[entry.address for entry in request.entries],
+                           status=TpStateSetResponse.OK),
+                       message.correlation_id)
+
+        elif message.message_type == Message.TP_STATE_DELETE_REQUEST:
+            request = TpStateDeleteRequest()
+            request.ParseFromString(message.content)
+            deleted = [a for a in request.addresses if self.state.pop(a, None) is not None]
+            self._send(identity, Message.TP_STATE_DELETE_RESPONSE,
+                       TpStateDeleteResponse(addresses=deleted, status=TpStateDeleteResponse.OK),
+                       message.correlation_id)
+
+        elif message.message_type == Message.TP_EVENT_ADD_REQUEST:
+            self.events += 1
+            self._send(identity, Message.TP_EVENT_ADD_RESPONSE,
+                       TpEventAddResponse(status=TpEventAddResponse.OK),
+                       message.correlation_id)
+
+        elif message.message_type == Message.TP_PROCESS_RESPONSE:
+            response = TpProcessResponse()
+            response.ParseFromString(message.content)
+            owner, start = self._in_flight.pop(message.correlation_id)
+            self._occupancy[owner] -= 1
+            self.results[message.correlation_id] = (
+                response.status, time.perf_counter() - start)
+
+        else:
+            LOGGER.debug("Ignoring message type %s", message.message_type)
+
+def _percentile(samples, percent):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+def summarize(results, elapsed):
+    """Throughput and latency percentiles of a process() run, as a dict.
+    Without results the latency fields are None.
+    """
+    latencies = [latency for _, latency in results]
+    return {
+        'transactions': len(results),
+        'ok': sum(1 for status, _ in results if status == TpProcessResponse.OK),
+        'invalid': sum(1 for status, _ in results
+                       if status == TpProcessResponse.INVALID_TRANSACTION),
+        'seconds': elapsed,
+        'txns_per_second': len(results) / elapsed if elapsed else 0.0,
+        'latency_p50_ms': _ms(_percentile(latencies, 50)),
+        'latency_p95_ms': _ms(_percentile(latencies, 95)),
+        'latency_p99_ms': _ms(_percentile(latencies, 99)),
+        'latency_max_ms': _ms(max(latencies) if latencies else None),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--endpoint', default=DEFAULT_ENDPOINT)
+    parser.add_argument('--processors', type=int, default=1,
+                        help='registrations to wait for before sending')
+    parser.add_argument('--count', type=int, default=10000,
+                        help='transactions to send')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='target transactions per second, 0 for as fast as possible')
+    parser.add_argument('--names', type=int, default=100,
+                        help='distinct code smell names used by the transactions')
+    parser.add_argument('--output', help='write the JSON summary to this file')
+    opts = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    validator = FakeValidator(opts.endpoint)
+    try:
+        validator.wait_for_processors(opts.processors, timeout=300)
+        requests = (
+            make_process_request("Smell{}".format(i % opts.names), str(i))
+            for i in range(opts.count))
+        start = time.perf_counter()
+        results = validator.process(requests, timeout=3600, rate=opts.rate)
+        summary = summarize(results, time.perf_counter() - start)
+        summary['rate'] = opts.rate
+        summary['processors'] = validator.processors
+    finally:
+        validator.close()
+
+    text = json.dumps(summary, indent=2, sort_keys=True)
+    if opts.output:
+        with open(opts.output, 'w') as fd:
+            fd.write(text + '\n')
+    print(text)
+
+if __name__ == '__main__':
+    main()
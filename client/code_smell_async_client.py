@@ -0,0 +1,240 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import yaml
+import base64
+import asyncio
+import itertools
+import aiohttp
+
+from sawtooth_sdk.protobuf.batch_pb2 import BatchList
+
+from code_smell_client import codeSmellClient
+from code_smell_client import _build_url
+from code_smell_client import _build_headers
+from code_smell_client import _parse_state_page
+from code_smell_client import _state_page_suffix
+from code_smell_client import DEFAULT_LIST_LIMIT
+from code_smell_client import DEFAULT_POOL_SIZE
+from code_smell_client import FAMILY_VERSION_CBOR
+from code_smell_client import MAX_BATCHES_PER_REQUEST
+from code_smell_client import MAX_TRANSACTIONS_PER_BATCH
+from code_smell_exceptions import codeSmellException
+from code_smell_exceptions import codeSmellNotFoundException
+from code_smell_pacing import THROTTLE_STATUSES
+from code_smell_pacing import retry_after
+from code_smell_waiter import batch_status_request
+
+DEFAULT_CONCURRENCY = 4
+
+
+class AsyncCodeSmellClient:
+    """asyncio version of codeSmellClient.
+
+    Transactions and batches are built and signed by a codeSmellClient in
+    the default executor, while up to concurrency requests, and the status
+    waits that follow them, run on a pooled aiohttp session. Create it from
+    a coroutine, aiohttp binds the session to the running event loop.
+    """
+
+    def __init__(self,
+                 base_url,
+                 keyfile=None,
+                 family_version=FAMILY_VERSION_CBOR,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 concurrency=DEFAULT_CONCURRENCY,
+                 rate_controller=None,
+                 validate=True):
+        self._base_url = base_url
+        self._builder = codeSmellClient(
+            base_url, keyfile=keyfile, family_version=family_version, pool_size=1,
+            rate_controller=rate_controller, validate=validate)
+        self._concurrency = asyncio.Semaphore(concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=pool_size))
+
+    async def close(self):
+        """Close the pooled connections"""
+        await self._session.close()
+        self._builder.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def list(self, limit=DEFAULT_LIST_LIMIT, auth_user=None, auth_password=None):
+        """Async generator version of codeSmellClient.list"""
+        code_smell_prefix = self._builder._get_prefix()
+
+        #later pages are read at the head of the first, see _iter_state
+        start = None
+        head = None
+        while True:
+            result = await self._send_request(
+                _state_page_suffix(code_smell_prefix, limit, start, head),
+                auth_user=auth_user,
+                auth_password=auth_password)
+            encoded_entries, start, page_head = _parse_state_page(result)
+            if head is None:
+                head = page_head
+
+            for entry in encoded_entries:
+                yield base64.b64decode(entry["data"])
+
+            if start is None:
+                return
+
+    async def create(self, name, value, action, wait=None, auth_user=None, auth_password=None):
+        loop = asyncio.get_running_loop()
+        batch_list = await loop.run_in_executor(
+            None, self._build_single, name, value, action)
+
+        return await self._post(
+            batch_list.batches, wait, auth_user=auth_user, auth_password=auth_password)
+
+    async def create_many(self,
+                          code_smells,
+                          txns_per_batch=MAX_TRANSACTIONS_PER_BATCH,
+                          batches_per_request=MAX_BATCHES_PER_REQUEST,
+                          smells_per_txn=1,
+                          wait=None,
+                          auth_user=None,
+                          auth_password=None):
+        """
+        Submit many code smells, see codeSmellClient.create_many.
+
+        The next BatchList is signed while earlier ones are posted and
+        waited on; at most concurrency requests are outstanding.
+
+        Returns:
+            list: ids of every submitted batch, in submission order
+        """
+        loop = asyncio.get_running_loop()
+        batch_lists = self._builder._iter_batch_lists(
+            code_smells, txns_per_batch, batches_per_request, smells_per_txn)
+
+        batch_ids = []
+        tasks = []
+        while True:
+            batches = await loop.run_in_executor(None, next, batch_lists, None)
+            if batches is None:
+                break
+            batch_ids.extend(batch.header_signature for batch in batches)
+
+            #bound the signed but unsent batches held in memory
+            await self._concurrency.acquire()
+            tasks.append(asyncio.ensure_future(self._post(
+                batches, wait, auth_user=auth_user, auth_password=auth_password, acquired=True)))
+
+        await asyncio.gather(*tasks)
+        return batch_ids
+
+    async def _get_statuses(self, batch_ids, wait, auth_user=None, auth_password=None):
+        """Statuses of batch_ids, in one request, see codeSmellBatchWaiter.poll"""
+        suffix, data, content_type = batch_status_request(batch_ids, wait)
+        try:
+            result = await self._send_request(
+                suffix, data, content_type,
+                auth_user=auth_user,
+                auth_password=auth_password)
+            return [entry['status'] for entry in yaml.safe_load(result)['data']]
+        except Exception as err:  # pylint: disable=broad-except
+            raise codeSmellException(err)
+
+    def _build_single(self, name, value, action):
+        transaction = self._builder._create_codeSmell_transaction(name, value, action)
+        return self._builder._create_batch_list([transaction])
+
+    async def _post(self, batches, wait, auth_user=None, auth_password=None, acquired=False):
+        if not acquired:
+            await self._concurrency.acquire()
+        #the status wait holds the slot too, so at most concurrency
+        #requests are outstanding
+        try:
+            try:
+                response = await self._send_request(
+                    "batches", BatchList(batches=batches).SerializeToString(),
+                    'application/octet-stream',
+                    auth_user=auth_user,
+                    auth_password=auth_password,
+                    paced=True)
+            except codeSmellException:
+                self._builder.reset_validation()
+                raise
+
+            if wait and wait > 0:
+                statuses = await self._get_statuses(
+                    [batch.header_signature for batch in batches],
+                    wait,
+                    auth_user=auth_user,
+                    auth_password=auth_password)
+                if 'INVALID' in statuses:
+                    self._builder.reset_validation()
+        finally:
+            self._concurrency.release()
+
+        return response
+
+    async def _send_request(self,
+                            suffix,
+                            data=None,
+                            content_type=None,
+                            name=None,
+                            auth_user=None,
+                            auth_password=None,
+                            paced=False):
+        url = _build_url(self._base_url, suffix)
+        headers = _build_headers(content_type, auth_user, auth_password)
+        rate_controller = self._builder._rate_controller
+
+        for attempt in itertools.count():
+            if paced:
+                await asyncio.sleep(rate_controller.reserve())
+
+            try:
+                if data is not None:
+                    request = self._session.post(url, headers=headers, data=data)
+                else:
+                    request = self._session.get(url, headers=headers)
+
+                async with request as result:
+                    text = await result.text()
+                    status, reason = result.status, result.reason
+                    delay = retry_after(result.headers)
+
+            except aiohttp.ClientConnectionError as err:
+                raise codeSmellException('Failed to connect to {}:{}'.format(url, str(err)))
+
+            except Exception as err:  # pylint: disable=broad-except
+                raise codeSmellException(err)
+
+            if status in THROTTLE_STATUSES:
+                throttle = rate_controller.on_throttle if paced else rate_controller.backoff
+                delay = throttle(attempt, delay)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+
+            if status == 404:
+                raise codeSmellNotFoundException("No such code Smell: {}".format(name))
+            elif status >= 400:
+                raise codeSmellException("Error {}:{}".format(status, reason))
+
+            if paced:
+                rate_controller.on_success()
+
+            return text
@@ -0,0 +1,131 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+Batch files hold signed BatchLists, each one serialized and prefixed with
+its length as a 4 byte big-endian integer, so they can be built offline
+and streamed to the REST API one request at a time.
+"""
+
+import os
+import csv
+import json
+import struct
+
+from code_smell_exceptions import codeSmellException
+
+INPUT_FORMATS = ('toml', 'csv', 'jsonl')
+
+_LENGTH = struct.Struct('>I')
+
+def iter_code_smells(filename, input_format=None):
+    """
+    Read code smells from an input file.
+
+    TOML files use the layout of code_smell.toml, a [code_smells] table of
+    tables of name = metric. CSV files have one name,value row per smell
+    and JSONL files one {"name": ..., "value": ...} object per line.
+
+    Args:
+        filename (str): input file
+        input_format (str): toml, csv or jsonl, from the extension if None
+
+    Yields:
+        tuple: name, value
+    """
+    if input_format is None:
+        input_format = os.path.splitext(filename)[1].lstrip('.').lower()
+    if input_format not in INPUT_FORMATS:
+        raise codeSmellException("Unknown input format: {}".format(input_format))
+
+    try:
+        with open(filename) as fd:
+            if input_format == 'toml':
+                import toml
+                parsed = toml.load(fd)
+                for code_smells in parsed['code_smells'].values():
+                    for name, metric in code_smells.items():
+                        yield name, str(metric)
+            elif input_format == 'csv':
+                for row in csv.reader(fd):
+                    if not row or row[0].startswith('#'):
+                        continue
+                    if len(row) != 2:
+                        raise codeSmellException("Invalid CSV row: {}".format(row))
+                    yield row[0].strip(), row[1].strip()
+            else:
+                for line in fd:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    yield entry['name'], str(entry['value'])
+    except OSError as err:
+        raise codeSmellException("Unable to read {}: {}".format(filename, err))
+    except (ValueError, KeyError, TypeError, AttributeError) as err:
+        raise codeSmellException("Invalid {} input {}: {}".format(input_format, filename, err))
+
+def write_batch_lists(filename, batch_lists):
+    """
+    Write BatchLists to a batch file.
+
+    Args:
+        filename (str): batch file, replaced once every list is written
+        batch_lists (iterable): BatchList messages
+
+    Returns:
+        tuple: number of BatchLists and of batches written
+    """
+    lists = batches = 0
+    temp_filename = "{}.tmp".format(filename)
+    try:
+        with open(temp_filename, 'wb') as fd:
+            for batch_list in batch_lists:
+                data = batch_list.SerializeToString()
+                fd.write(_LENGTH.pack(len(data)))
+                fd.write(data)
+                lists += 1
+                batches += len(batch_list.batches)
+        os.replace(temp_filename, filename)
+    except OSError as err:
+        raise codeSmellException("Unable to write {}: {}".format(filename, err))
+    finally:
+        #building the lists can fail too, do not leave a partial file
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
+    return lists, batches
+
+def read_batch_lists(filename):
+    """
+    Stream the BatchLists of a batch file.
+
+    Yields:
+        bytes: each serialized BatchList
+    """
+    try:
+        with open(filename, 'rb') as fd:
+            while True:
+                prefix = fd.read(_LENGTH.size)
+                if not prefix:
+                    return
+                if len(prefix) < _LENGTH.size:
+                    raise codeSmellException("Truncated batch file: {}".format(filename))
+                length, = _LENGTH.unpack(prefix)
+                data = fd.read(length)
+                if len(data) < length:
+                    raise codeSmellException("Truncated batch file: {}".format(filename))
+                yield data
+    except OSError as err:
+        raise codeSmellException("Unable to read {}: {}".format(filename, err))
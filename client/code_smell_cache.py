@@ -0,0 +1,201 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import os
+import json
+import yaml
+import base64
+
+from code_smell_client import DEFAULT_LIST_LIMIT
+from code_smell_exceptions import codeSmellException
+
+#gaps longer than this, in blocks, read the whole namespace again
+MAX_REPLAY_BLOCKS = 100
+#so do more changed addresses than this, one request each
+MAX_CHANGED_ADDRESSES = 100
+BLOCK_PAGE_LIMIT = 100
+
+
+class codeSmellReadCache:
+    """Decoded code smell state, kept between reads while the head holds.
+
+    Every read first asks the REST API for the chain head, a one entry
+    state request. While the head matches the cached one, entries are
+    served from memory. When it moves, the blocks committed since the
+    cached head are walked and only the addresses their transactions wrote
+    are read again, at the new head. A fork or a gap longer than
+    max_replay_blocks reads the namespace again instead. With filename, the cache is also kept on
+    disk between runs.
+    """
+
+    def __init__(self,
+                 client,
+                 filename=None,
+                 max_replay_blocks=MAX_REPLAY_BLOCKS,
+                 max_changed_addresses=MAX_CHANGED_ADDRESSES):
+        """Constructor
+
+        Args:
+            client (codeSmellClient): sends the REST API requests
+            filename (str): file the cache is loaded from and saved to
+            max_replay_blocks (int): longest gap refreshed address by address
+            max_changed_addresses (int): most addresses refreshed one by one
+        """
+        self._client = client
+        self._prefix = client._get_prefix()
+        self._filename = filename
+        self._max_replay_blocks = max_replay_blocks
+        self._max_changed_addresses = max_changed_addresses
+        self._head = None
+        self._entries = {}
+        self._load()
+
+    @property
+    def head(self):
+        """Id of the block the cached entries were read at"""
+        return self._head
+
+    def list(self, limit=DEFAULT_LIST_LIMIT, auth_user=None, auth_password=None):
+        """
+        Cached version of codeSmellClient.list.
+
+        Args:
+            limit (int): entries fetched per page when the namespace is
+                read again
+
+        Returns:
+            list: the decoded data of each state entry, in address order
+        """
+        self.refresh(limit, auth_user=auth_user, auth_password=auth_password)
+        return [self._entries[address] for address in sorted(self._entries)]
+
+    def refresh(self, limit=DEFAULT_LIST_LIMIT, auth_user=None, auth_password=None):
+        """
+        Bring the cache up to the current chain head.
+
+        Returns:
+            bool: True if the head moved since the last refresh
+        """
+        head = self._client._get_head(auth_user=auth_user, auth_password=auth_password)
+        if head is not None and head == self._head:
+            return False
+
+        changed = None
+        if self._head is not None and head is not None:
+            changed = self._changed_addresses(
+                head, auth_user=auth_user, auth_password=auth_password)
+
+        if changed is None:
+            self._entries = dict(self._client._iter_state(
+                self._prefix, limit, head, auth_user=auth_user, auth_password=auth_password))
+        else:
+            for address in changed:
+                entries = list(self._client._iter_state(
+                    address, 1, head, auth_user=auth_user, auth_password=auth_password))
+                if entries:
+                    self._entries[address] = entries[0][1]
+                else:
+                    self._entries.pop(address, None)
+
+        self._head = head
+        self._save()
+        return True
+
+    def clear(self):
+        """Drop every cached entry, the next read fetches the namespace"""
+        self._head = None
+        self._entries = {}
+        self._save()
+
+    def _changed_addresses(self, head, auth_user=None, auth_password=None):
+        """
+        Addresses in the namespace written by blocks after the cached head.
+
+        Returns:
+            set: changed addresses, or None when they cannot be told apart
+        """
+        changed = set()
+        walked = 0
+        start = None
+        while walked < self._max_replay_blocks:
+            suffix = "blocks?head={}&limit={}".format(
+                head, min(BLOCK_PAGE_LIMIT, self._max_replay_blocks - walked))
+            if start is not None:
+                suffix += "&start={}".format(start)
+            result = self._client._send_request(
+                suffix, auth_user=auth_user, auth_password=auth_password)
+
+            try:
+                page = yaml.safe_load(result)
+                blocks = page["data"]
+                start = page.get("paging", {}).get("next_position")
+            except (yaml.YAMLError, TypeError, KeyError, AttributeError) as err:
+                raise codeSmellException("Invalid blocks page: {}".format(err))
+
+            for block in blocks:
+                if block["header_signature"] == self._head:
+                    return changed
+                walked += 1
+                for batch in block["batches"]:
+                    for transaction in batch["transactions"]:
+                        for output in transaction["header"]["outputs"]:
+                            if output.startswith(self._prefix):
+                                changed.add(output)
+
+            if len(changed) > self._max_changed_addresses or start is None:
+                return None
+
+        return None
+
+    def _load(self):
+        if self._filename is None or not os.path.exists(self._filename):
+            return
+
+        try:
+            with open(self._filename) as fd:
+                cached = json.load(fd)
+            if cached["prefix"] != self._prefix:
+                return
+            self._entries = {
+                address: base64.b64decode(data)
+                for address, data in cached["entries"].items()
+            }
+            self._head = cached["head"]
+        except (OSError, ValueError, KeyError, TypeError):
+            #unreadable caches are rebuilt on the next read
+            self._head = None
+            self._entries = {}
+
+    def _save(self):
+        if self._filename is None:
+            return
+
+        cached = {
+            "head": self._head,
+            "prefix": self._prefix,
+            "entries": {
+                address: base64.b64encode(data).decode()
+                for address, data in self._entries.items()
+            },
+        }
+
+        temp_filename = "{}.tmp".format(self._filename)
+        try:
+            with open(temp_filename, "w") as fd:
+                json.dump(cached, fd)
+            os.replace(temp_filename, self._filename)
+        except OSError as err:
+            raise codeSmellException(
+                "Failed to write cache {}: {}".format(self._filename, err))
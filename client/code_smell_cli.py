@@ -17,16 +17,21 @@ from __future__ import print_function
 
 import os
 import sys
-import toml
 import getpass
 import logging
 import argparse
 import traceback
-import pkg_resources
 
-from pprint import pprint
-from colorlog import ColoredFormatter
-from code_smell_client import codeSmellClient
+#the client, its dependencies (requests, yaml, protobuf, signing), toml
+#and colorlog are imported by the commands that use them, so parsing
+#arguments and --help stay fast
+from code_smell_constants import DEFAULT_LIST_LIMIT
+from code_smell_constants import DEFAULT_MAX_PENDING
+from code_smell_constants import DEFAULT_SMELLS_PER_TXN
+from code_smell_constants import DEFAULT_VALIDATOR_URL
+from code_smell_constants import MAX_BATCHES_PER_REQUEST
+from code_smell_constants import MAX_TRANSACTIONS_PER_BATCH
+from code_smell_batch_file import INPUT_FORMATS
 from code_smell_exceptions import codeSmellException
 
 DISTRIBUTION_NAME = 'sawtooth-code_smell'
@@ -43,6 +48,7 @@ def create_console_handler(verbose_level):
     Returns:
         clog: console handler to display verbose output
     """
+    from colorlog import ColoredFormatter
 
     clog = logging.StreamHandler()
     formatter = ColoredFormatter(
@@ -199,6 +205,141 @@ def add_default_parser(subparser, parent_parser):
         #default=30, ## TODO: update this value to something appropiate
         help='set time, in seconds, to wait for code smell to commit')
 
+    parser.add_argument(
+        '--smells-per-txn',
+        type=int,
+        default=DEFAULT_SMELLS_PER_TXN,
+        help='code smells packed in each transaction')
+
+    parser.add_argument(
+        '--txns-per-batch',
+        type=int,
+        default=MAX_TRANSACTIONS_PER_BATCH,
+        help='transactions packed in each batch')
+
+    parser.add_argument(
+        '--batches-per-request',
+        type=int,
+        default=MAX_BATCHES_PER_REQUEST,
+        help='batches sent in each request to the REST API')
+
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='submit with the asyncio client, keeping up to this many '
+        'requests in flight')
+
+    parser.add_argument(
+        '--signing-workers',
+        type=int,
+        help='sign transactions and batches on this many processes')
+
+    parser.add_argument(
+        '--sync',
+        action='store_true',
+        default=False,
+        help='only submit code smells missing from the chain or whose '
+        'metric differs, reporting the difference')
+
+def add_propose_parser(subparser, parent_parser):
+    """
+    add_propose_parser, add subparser propose. this subparser will open a
+        proposal to change the metric of an existing code smell.
+
+    Args:
+        subparser (subparser): subparser handler
+        parent_parser (parser): parent parser
+    """
+    parser = subparser.add_parser(
+        'propose',
+        help='Propose a new metric for codeSmell <name>',
+        description='Send a transaction to propose a new metric for a code smell',
+        parents=[parent_parser])
+
+    parser.add_argument(
+        '-n', '--name',
+        type=str,
+        help='code smell identifier')
+
+    parser.add_argument(
+        '-m', '--metric',
+        type=str,
+        help='proposed metric of code smell')
+
+    _add_transaction_arguments(parser)
+
+def add_vote_parser(subparser, parent_parser):
+    """
+    add_vote_parser, add subparser vote. this subparser will vote on the open
+        proposal of a code smell.
+
+    Args:
+        subparser (subparser): subparser handler
+        parent_parser (parser): parent parser
+    """
+    parser = subparser.add_parser(
+        'vote',
+        help='Vote on the proposal for codeSmell <name>',
+        description='Send a transaction to accept or reject a code smell proposal',
+        parents=[parent_parser])
+
+    parser.add_argument(
+        '-n', '--name',
+        type=str,
+        help='code smell identifier')
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        '--accept',
+        dest='vote',
+        action='store_const',
+        const='accept',
+        help='accept the proposal')
+
+    group.add_argument(
+        '--reject',
+        dest='vote',
+        action='store_const',
+        const='reject',
+        help='reject the proposal')
+
+    _add_transaction_arguments(parser)
+
+def _add_transaction_arguments(parser):
+    """
+    Arguments shared by the subparsers that send transactions.
+
+    Args:
+        parser (parser): subparser to extend
+    """
+    parser.add_argument(
+        '--url',
+        type=str,
+        help='specify URL of REST API')
+
+    parser.add_argument(
+        '--username',
+        type=str,
+        help="identify name of user's private key file")
+
+    parser.add_argument(
+        '--key-dir',
+        type=str,
+        help="identify directory of user's private key file")
+
+    parser.add_argument(
+        '--disable-client-valiation',
+        action='store_true',
+        default=False,
+        help='disable client validation')
+
+    parser.add_argument(
+        '--wait',
+        nargs='?',
+        const=sys.maxsize,
+        type=int,
+        help='set time, in seconds, to wait for transaction to commit')
+
 def add_list_parser(subparser, parent_parser):
     """
     define subparser list. Displays information for all code smells
@@ -229,6 +370,230 @@ def add_list_parser(subparser, parent_parser):
         type=str,
         help="identify directory of user's private key file")
 
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=DEFAULT_LIST_LIMIT,
+        help='number of state entries fetched per page (default: {})'.format(
+            DEFAULT_LIST_LIMIT))
+
+    parser.add_argument(
+        '--cache-file',
+        type=str,
+        help='keep the listing in this file, only reading what changed '
+        'since the last block it was read at')
+
+def add_show_parser(subparser, parent_parser):
+    """
+    define subparser show. Displays one code smell, read from its own state
+        address.
+
+    Args:
+        subparser (subparser): subparser handler
+        parent_parser (parser): parent parser
+    """
+    parser = subparser.add_parser(
+        'show',
+        help='Displays information of one code smell',
+        description='Displays the metric and action of one code smell.',
+        parents=[parent_parser])
+
+    parser.add_argument(
+        'name',
+        type=str,
+        help='name of the code smell')
+
+    parser.add_argument(
+        '--url',
+        type=str,
+        help='specify URL of REST API')
+
+def add_get_parser(subparser, parent_parser):
+    """
+    define subparser get. Displays many code smells, read concurrently from
+        their own state addresses.
+
+    Args:
+        subparser (subparser): subparser handler
+        parent_parser (parser): parent parser
+    """
+    parser = subparser.add_parser(
+        'get',
+        help='Displays information of many code smells',
+        description='Displays the metric and action of each named code '
+        'smell, marking the ones that do not exist.',
+        parents=[parent_parser])
+
+    parser.add_argument(
+        'names',
+        type=str,
+        nargs='+',
+        help='names of the code smells')
+
+    parser.add_argument(
+        '--url',
+        type=str,
+        help='specify URL of REST API')
+
+def add_watch_parser(subparser, parent_parser):
+    """
+    define subparser watch. Displays every code smell, then each change as
+        its block commits, from validator events instead of polling.
+
+    Args:
+        subparser (subparser): subparser handler
+        parent_parser (parser): parent parser
+    """
+    parser = subparser.add_parser(
+        'watch',
+        help='Displays code smell changes as they commit',
+        description='Displays the metric of every code smell, then follows '
+        'the validator events to display each change as its block commits.',
+        parents=[parent_parser])
+
+    parser.add_argument(
+        '--url',
+        type=str,
+        help='specify URL of REST API')
+
+    parser.add_argument(
+        '--validator-url',
+        type=str,
+        default=DEFAULT_VALIDATOR_URL,
+        help='specify the validator endpoint to receive events from '
+        '(default: {})'.format(DEFAULT_VALIDATOR_URL))
+
+def add_batch_parser(subparser, parent_parser):
+    """
+    define subparser batch, with the commands build, to sign code smells
+        into a batch file offline, and submit, to stream a batch file to
+        the REST API.
+
+    Args:
+        subparser (subparser): subparser handler
+        parent_parser (parser): parent parser
+    """
+    parser = subparser.add_parser(
+        'batch',
+        help='Builds and submits files of signed batches',
+        description='Signs code smells into a batch file ahead of time, '
+        'and streams batch files to the REST API.',
+        parents=[parent_parser])
+
+    batch_subparsers = parser.add_subparsers(title='batch commands', dest='batch_command')
+    batch_subparsers.required = True
+
+    build_parser = batch_subparsers.add_parser(
+        'build',
+        help='Signs code smells into a batch file',
+        description='Reads code smells from a TOML, CSV or JSONL file and '
+        'writes them, signed, to a batch file.',
+        parents=[parent_parser])
+
+    build_parser.add_argument(
+        'input',
+        type=str,
+        help='code smells to sign')
+
+    build_parser.add_argument(
+        '-o', '--output',
+        type=str,
+        required=True,
+        help='batch file to write')
+
+    build_parser.add_argument(
+        '--format',
+        choices=INPUT_FORMATS,
+        help='format of the input, from its extension by default')
+
+    build_parser.add_argument(
+        '--username',
+        type=str,
+        help="identify name of user's private key file")
+
+    build_parser.add_argument(
+        '--key-dir',
+        type=str,
+        help="identify directory of user's private key file")
+
+    build_parser.add_argument(
+        '--smells-per-txn',
+        type=int,
+        default=DEFAULT_SMELLS_PER_TXN,
+        help='code smells packed in each transaction')
+
+    build_parser.add_argument(
+        '--txns-per-batch',
+        type=int,
+        default=MAX_TRANSACTIONS_PER_BATCH,
+        help='transactions packed in each batch')
+
+    build_parser.add_argument(
+        '--batches-per-request',
+        type=int,
+        default=MAX_BATCHES_PER_REQUEST,
+        help='batches sent in each request to the REST API')
+
+    build_parser.add_argument(
+        '--signing-workers',
+        type=int,
+        help='sign transactions and batches on this many processes')
+
+    build_parser.add_argument(
+        '--disable-client-valiation',
+        action='store_true',
+        default=False,
+        help='disable client validation')
+
+    submit_parser = batch_subparsers.add_parser(
+        'submit',
+        help='Streams a batch file to the REST API',
+        description='Posts each BatchList of a batch file to the REST API, '
+        'holding back while too many batches are pending.',
+        parents=[parent_parser])
+
+    submit_parser.add_argument(
+        'file',
+        type=str,
+        help='batch file to submit')
+
+    submit_parser.add_argument(
+        '--url',
+        type=str,
+        help='specify URL of REST API')
+
+    submit_parser.add_argument(
+        '--max-pending',
+        type=int,
+        default=DEFAULT_MAX_PENDING,
+        help='submitted batches allowed to be pending before the next '
+        'request (default: {})'.format(DEFAULT_MAX_PENDING))
+
+    submit_parser.add_argument(
+        '--wait',
+        nargs='?',
+        const=sys.maxsize,
+        type=int,
+        help='set time, in seconds, to wait for the batches to commit')
+
+class _VersionAction(argparse.Action):
+    """--version, looking the version up only when it is asked for"""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings, dest=dest, default=argparse.SUPPRESS,
+                         nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from importlib import metadata
+
+        try:
+            version = metadata.version(DISTRIBUTION_NAME)
+        except metadata.PackageNotFoundError:
+            version = 'UNKOWN'
+
+        parser.exit(message=(DISTRIBUTION_NAME + ' (Hyperledger Sawtooth) version {}\n')
+                    .format(version))
+
 def create_parent_parser(prog_name):
     """
     Create parent parser
@@ -239,9 +604,6 @@ def create_parent_parser(prog_name):
     Returns:
         parser: parent argument parser
 
-    Raises:
-        DistributionNotFound: version of family not found
-
     """
     parent_parser = argparse.ArgumentParser(prog=prog_name, add_help=False)
     parent_parser.add_argument(
@@ -249,15 +611,9 @@ def create_parent_parser(prog_name):
         action='count',
         help='enable more verbose output')
 
-    try:
-        version = pkg_resources.get_distribution(DISTRIBUTION_NAME).version
-    except pkg_resources.DistributionNotFound:
-        version = 'UNKOWN'
-
     parent_parser.add_argument(
         '-V', '--version',
-        action='version',
-        version=(DISTRIBUTION_NAME + ' (Hyperledger Sawtooth) version {}').format(version),
+        action=_VersionAction,
         help='display version information')
 
     return parent_parser
@@ -284,7 +640,13 @@ def create_parser(prog_name):
     subparsers.required = True
     add_create_parser(subparsers, parent_parser)
     add_default_parser(subparsers, parent_parser)
+    add_propose_parser(subparsers, parent_parser)
+    add_vote_parser(subparsers, parent_parser)
     add_list_parser(subparsers, parent_parser)
+    add_show_parser(subparsers, parent_parser)
+    add_get_parser(subparsers, parent_parser)
+    add_watch_parser(subparsers, parent_parser)
+    add_batch_parser(subparsers, parent_parser)
 
     return parser
 
@@ -296,25 +658,27 @@ def list_all_smells(args):
         Args:
             args (array) arguments
     """
-    url = _get_url(args)
-    keyfile = _get_keyfile(args)
-    client = codeSmellClient(base_url=url, keyfile=keyfile)
+    from code_smell_cache import codeSmellReadCache
+    from code_smell_client import codeSmellClient
 
-    codeSmell_list = [
-        code_smell.split(',')
-        for code_smells in client.list()
-        for code_smell in code_smells.decode().split('|')
-    ]
+    url = _get_url(args)
 
-    pprint (codeSmell_list)
-    if codeSmell_list is not None:
-        format = "<%s>, <%s>, <%s>"
+    format = "<%s>, <%s>, <%s>"
+    with codeSmellClient(base_url=url) as client:
         print(format % ('CODE SMELL', 'METRIC', 'ACTION'))
-        for codeSmell_data in codeSmell_list:
-            name, metric, action = codeSmell_data
-            print(format % (name, metric, action))
-    else:
-        raise codeSmellException ("Could not retrieve listing.")
+        if args.cache_file:
+            cache = codeSmellReadCache(client, filename=args.cache_file)
+            entries = cache.list(limit=args.limit)
+        else:
+            entries = client.list(limit=args.limit)
+
+        for code_smells in entries:
+            for code_smell in code_smells.decode().split('|'):
+                """proposal tallies and votes share the namespace, only
+                    show code smells and open proposals"""
+                name, metric, action = code_smell.split(',')
+                if action in ('create', 'propose'):
+                    print(format % (name, metric, action), flush=True)
 
 def load_default(args):
     """
@@ -323,6 +687,11 @@ def load_default(args):
         Args:
             args, arguments (array)
     """
+    import toml
+
+    from code_smell_client import codeSmellClient
+    from code_smell_signing import codeSmellSigningPool
+    from code_smell_waiter import codeSmellBatchWaiter
 
     """identify code_smell family configuration file"""
     conf_file = HOME + '/etc/code_smell.toml'
@@ -344,22 +713,266 @@ def load_default(args):
         """get default code smells"""
         code_smells_config = parsed_toml_config['code_smells']
 
-        """traverse dict and process each code smell
+        """traverse dict and stream each code smell
             nested for loop to procces level two dict."""
-        for code_smells in code_smells_config.values():
-            for name, metric in code_smells.items():
-                """send trasaction"""
-                print("code sent: {}".format(name))
-                client = codeSmellClient(base_url=url, keyfile=keyfile)
-                if args.wait and args.wait > 0:
-                    response = client.create(name, str(metric), "create", wait=args.wait)
-                else:
-                    response = client.create(name, str(metric), "create")
-                print("Response: {}".format(response))
+        code_smells_list = (
+            (name, str(metric))
+            for code_smells in code_smells_config.values()
+            for name, metric in code_smells.items()
+        )
+
+        if args.sync:
+            code_smells_list = _sync_code_smells(url, code_smells_list)
+            if not code_smells_list:
+                return
+
+        """pack code smells into batch transactions, batches and requests"""
+        if args.concurrency:
+            batch_ids = _create_many_async(args, url, keyfile, code_smells_list)
+        else:
+            signing_pool = None
+            if args.signing_workers:
+                signing_pool = codeSmellSigningPool(keyfile, args.signing_workers)
+
+            try:
+                with codeSmellClient(
+                        base_url=url,
+                        keyfile=keyfile,
+                        validate=not args.disable_client_valiation) as client:
+                    waiter = codeSmellBatchWaiter(client)
+                    batch_ids = client.create_many(
+                        code_smells_list,
+                        txns_per_batch=args.txns_per_batch,
+                        batches_per_request=args.batches_per_request,
+                        smells_per_txn=args.smells_per_txn,
+                        waiter=waiter,
+                        signing_pool=signing_pool)
+                    if args.wait and args.wait > 0:
+                        _print_batch_results(waiter.wait(args.wait))
+                        return
+            finally:
+                if signing_pool is not None:
+                    signing_pool.close()
+
+        print("Batches sent: {}".format(len(batch_ids)))
+        for batch_id in batch_ids:
+            print(batch_id)
 
     else:
         raise codeSmellException("Configuration File {} does not exists".format(conf_file))
 
+def _sync_code_smells(url, code_smells):
+    """
+    Diff code smells against the chain, printing the difference.
+
+    Args:
+        url (str): REST API url
+        code_smells (iterable): (name, value) tuples
+
+    Returns:
+        list: (name, value) of the code smells to create or change
+    """
+    from code_smell_client import codeSmellClient
+    from code_smell_client import diff_code_smells
+
+    with codeSmellClient(base_url=url) as client:
+        current = client.current_code_smells()
+
+    created, changed, unchanged = diff_code_smells(code_smells, current)
+
+    for name, value in created:
+        print("+ {} {}".format(name, value))
+    for name, old, new in changed:
+        print("~ {} {} -> {}".format(name, old, new))
+    print("{} to create, {} to change, {} unchanged".format(
+        len(created), len(changed), len(unchanged)))
+
+    return created + [(name, new) for name, _, new in changed]
+
+def show_smell(args):
+    """
+    show one code smell
+        <name> <metric> <action>
+
+    Args:
+        args (array) arguments
+    """
+    from code_smell_client import codeSmellClient
+
+    with codeSmellClient(base_url=_get_url(args)) as client:
+        name, metric, action = client.show(args.name)
+
+    format = "<%s>, <%s>, <%s>"
+    print(format % ('CODE SMELL', 'METRIC', 'ACTION'))
+    print(format % (name, metric, action))
+
+def get_smells(args):
+    """
+    show many code smells, missing ones as <name>, <->, <->
+        <name> <metric> <action>
+
+    Args:
+        args (array) arguments
+    """
+    from code_smell_client import codeSmellClient
+
+    with codeSmellClient(base_url=_get_url(args)) as client:
+        code_smells = client.get_many(args.names)
+
+    format = "<%s>, <%s>, <%s>"
+    print(format % ('CODE SMELL', 'METRIC', 'ACTION'))
+    for name, code_smell in code_smells.items():
+        if code_smell is None:
+            print(format % (name, '-', '-'))
+        else:
+            print(format % code_smell)
+
+def watch_smells(args):
+    """
+    show every code smell, then each change as its block commits
+        <name> <metric> <block>
+
+    Args:
+        args (array) arguments
+    """
+    import time
+    from code_smell_client import codeSmellClient
+    from code_smell_mirror import codeSmellMirror
+
+    format = "<%s>, <%s>, <%s>"
+
+    def on_update(block_id, changes):
+        for name, metric in changes:
+            print(format % (name, metric, block_id[:16]), flush=True)
+
+    print(format % ('CODE SMELL', 'METRIC', 'BLOCK'))
+    with codeSmellClient(base_url=_get_url(args)) as client:
+        with codeSmellMirror(client, args.validator_url, on_update=on_update):
+            while True:
+                time.sleep(1)
+
+def do_batch(args):
+    """
+    batch build and batch submit commands.
+
+    Args:
+        args (array): arguments
+    """
+    if args.batch_command == 'build':
+        build_batch_file(args)
+    elif args.batch_command == 'submit':
+        submit_batch_file(args)
+    else:
+        raise codeSmellException("Invalid batch command: {}".format(args.batch_command))
+
+def build_batch_file(args):
+    """
+    Sign the code smells of args.input into the batch file args.output.
+
+    Args:
+        args (array): arguments
+    """
+    from sawtooth_sdk.protobuf.batch_pb2 import BatchList
+
+    from code_smell_batch_file import iter_code_smells
+    from code_smell_batch_file import write_batch_lists
+    from code_smell_client import codeSmellClient
+    from code_smell_signing import codeSmellSigningPool
+
+    keyfile = _get_keyfile(args)
+    code_smells = iter_code_smells(args.input, args.format)
+
+    signing_pool = None
+    if args.signing_workers:
+        signing_pool = codeSmellSigningPool(keyfile, args.signing_workers)
+
+    try:
+        with codeSmellClient(
+                base_url=None,
+                keyfile=keyfile,
+                validate=not args.disable_client_valiation) as client:
+            batch_lists = client._iter_batch_lists(
+                code_smells,
+                args.txns_per_batch,
+                args.batches_per_request,
+                args.smells_per_txn,
+                signing_pool)
+            try:
+                lists, batches = write_batch_lists(
+                    args.output, (BatchList(batches=b) for b in batch_lists))
+            finally:
+                #nothing built here is submitted
+                client.reset_validation()
+    finally:
+        if signing_pool is not None:
+            signing_pool.close()
+
+    print("Wrote {} batches in {} requests to {}".format(batches, lists, args.output))
+
+def submit_batch_file(args):
+    """
+    Stream the batch file args.file to the REST API.
+
+    Args:
+        args (array): arguments
+    """
+    from code_smell_batch_file import read_batch_lists
+    from code_smell_client import codeSmellClient
+    from code_smell_waiter import codeSmellBatchWaiter
+
+    with codeSmellClient(base_url=_get_url(args)) as client:
+        waiter = codeSmellBatchWaiter(client)
+        batch_ids = client.submit_batch_lists(
+            read_batch_lists(args.file),
+            max_pending=args.max_pending,
+            waiter=waiter)
+        if args.wait and args.wait > 0:
+            _print_batch_results(waiter.wait(args.wait))
+            return
+
+    print("Batches sent: {}".format(len(batch_ids)))
+    for batch_id in batch_ids:
+        print(batch_id)
+
+def _print_batch_results(results):
+    """
+    Print the status and submit to commit latency of every batch.
+
+    Args:
+        results (dict): batch id keys, BatchResult values
+    """
+    format = "%-10s %10s  %s"
+    print(format % ('STATUS', 'LATENCY', 'BATCH'))
+    for result in results.values():
+        latency = "-" if result.latency is None else "%.2fs" % result.latency
+        print(format % (result.status, latency, result.batch_id))
+
+def _create_many_async(args, url, keyfile, code_smells):
+    """
+    Submit code smells with AsyncCodeSmellClient, overlapping signing,
+        requests and status waits.
+
+    Returns:
+        list: submitted batch ids
+    """
+    import asyncio
+    from code_smell_async_client import AsyncCodeSmellClient
+
+    async def submit():
+        async with AsyncCodeSmellClient(
+                base_url=url,
+                keyfile=keyfile,
+                concurrency=args.concurrency,
+                validate=not args.disable_client_valiation) as client:
+            return await client.create_many(
+                code_smells,
+                txns_per_batch=args.txns_per_batch,
+                batches_per_request=args.batches_per_request,
+                smells_per_txn=args.smells_per_txn,
+                wait=args.wait)
+
+    return asyncio.run(submit())
+
 def do_create(args):
     """
     Create new code smell, users can define custom code smells.
@@ -399,6 +1012,55 @@ def do_create(args):
 
     print("Response: {}".format(response))"""
 
+def do_propose(args):
+    """
+    Propose a new metric for an existing code smell.
+
+    Args:
+        args (array): proposal arguments
+
+    Raises:
+        codeSmellException: missing arguement
+    """
+    if args.name is None:
+        raise codeSmellException ("Missing code smell name")
+    if args.metric is None:
+        raise codeSmellException ("Missing code smell metric")
+
+    _send_transaction(args, args.name, args.metric, "propose")
+
+def do_vote(args):
+    """
+    Vote on the open proposal of a code smell.
+
+    Args:
+        args (array): vote arguments
+
+    Raises:
+        codeSmellException: missing arguement
+    """
+    if args.name is None:
+        raise codeSmellException ("Missing code smell name")
+
+    _send_transaction(args, args.name, args.vote, "vote")
+
+def _send_transaction(args, name, value, action):
+    from code_smell_client import codeSmellClient
+
+    url = _get_url(args)
+    keyfile = _get_keyfile(args)
+    client = codeSmellClient(
+        base_url=url,
+        keyfile=keyfile,
+        validate=not args.disable_client_valiation)
+
+    if args.wait and args.wait > 0:
+        response = client.create(name, value, action, wait=args.wait)
+    else:
+        response = client.create(name, value, action)
+
+    print("Response: {}".format(response))
+
 def _get_url(args):
     """
     Pull rest_api url, use default if user does not specify
@@ -464,8 +1126,20 @@ def main(prog_name=os.path.basename(sys.argv[0]), args=None):
         do_create(args)
     elif args.command == 'default':
         load_default(args)
+    elif args.command == 'propose':
+        do_propose(args)
+    elif args.command == 'vote':
+        do_vote(args)
     elif args.command == 'list':
         list_all_smells(args)
+    elif args.command == 'show':
+        show_smell(args)
+    elif args.command == 'get':
+        get_smells(args)
+    elif args.command == 'watch':
+        watch_smells(args)
+    elif args.command == 'batch':
+        do_batch(args)
     else:
         raise codeSmellException("Invalid command: {}".format(args.command))
 
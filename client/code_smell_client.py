@@ -13,69 +13,379 @@
 # limitations under the License.
 # ------------------------------------------------------------------------------
 
+import os
 import time
+import types
 import yaml
 import random
 import base64
 import hashlib
 import requests
+import itertools
+import concurrent.futures
 
-from pprint import pprint
 from base64 import b64encode
-from sawtooth_signing import ParseError
-from sawtooth_signing import CryptoFactory
-from sawtooth_signing import create_context
-from sawtooth_signing.secp256k1 import Secp256k1PrivateKey
-
-from sawtooth_sdk.protobuf.batch_pb2 import Batch
-from sawtooth_sdk.protobuf.batch_pb2 import BatchList
-from sawtooth_sdk.protobuf.batch_pb2 import BatchHeader
-from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
-from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
-
+from requests.adapters import HTTPAdapter
+
+#cbor, the signing library and the protobuf messages (see _messages) are
+#imported on first use, so read-only commands never load them
+from code_smell_constants import FAMILY_VERSION_CSV
+from code_smell_constants import FAMILY_VERSION_CBOR
+from code_smell_constants import DEFAULT_POOL_SIZE
+from code_smell_constants import MAX_TRANSACTIONS_PER_BATCH
+from code_smell_constants import MAX_BATCHES_PER_REQUEST
+from code_smell_constants import BACKPRESSURE_TIMEOUT
+from code_smell_constants import CHAIN_NONE
+from code_smell_constants import CHAIN_SUBMISSION
+from code_smell_constants import CHAIN_ALL
+from code_smell_constants import CHAIN_SCOPES
+from code_smell_constants import DEFAULT_LIST_LIMIT
+from code_smell_constants import MAX_LIST_LIMIT
+from code_smell_constants import APPROVAL_THRESHOLD_NAME
 from code_smell_exceptions import codeSmellException
+from code_smell_exceptions import codeSmellNotFoundException
+from code_smell_pacing import THROTTLE_STATUSES
+from code_smell_pacing import codeSmellRateController
+from code_smell_pacing import retry_after
+from code_smell_waiter import codeSmellBatchWaiter
+
+#signers already loaded, by key file path
+_SIGNERS = {}
+
+#protobuf messages, imported by _messages on first use
+_MESSAGES = None
+
+def _messages():
+    """
+    The sawtooth protobuf messages the client builds, imported once.
+
+    Returns:
+        SimpleNamespace: Batch, BatchHeader, BatchList, Transaction and
+            TransactionHeader
+    """
+    global _MESSAGES
+    if _MESSAGES is None:
+        from sawtooth_sdk.protobuf import batch_pb2
+        from sawtooth_sdk.protobuf import transaction_pb2
+        _MESSAGES = types.SimpleNamespace(
+            Batch=batch_pb2.Batch,
+            BatchHeader=batch_pb2.BatchHeader,
+            BatchList=batch_pb2.BatchList,
+            Transaction=transaction_pb2.Transaction,
+            TransactionHeader=transaction_pb2.TransactionHeader)
+    return _MESSAGES
 
 def _sha512(data):
     return hashlib.sha512(data).hexdigest()
 
+def _encode_payload(action, code_smells, family_version):
+    """
+    Serialize a payload for the given family version.
+
+    Args:
+        action (str): create, propose, vote or batch
+        code_smells (list): (name, value) tuples, exactly one unless action is batch
+        family_version (str): '0.1' (csv) or '0.2' (cbor)
+
+    Returns:
+        bytes: serialized payload
+    """
+    if family_version == FAMILY_VERSION_CBOR:
+        if action == 'batch':
+            content = {'action': action,
+                       'entries': [[name, value] for name, value in code_smells]}
+        else:
+            name, value = code_smells[0]
+            content = {'action': action, 'name': name, 'value': value}
+        import cbor
+        return cbor.dumps(content)
+
+    #serialization is just a delimited utf-8 encoded strings
+    return "|".join(",".join([name, value, action]) for name, value in code_smells).encode()
+
+def _chunks(iterable, size):
+    """Lazily split iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _build_url(base_url, suffix):
+    if base_url.startswith("http://"):
+        return "{}/{}".format(base_url, suffix)
+    return "http://{}/{}".format(base_url, suffix)
+
+def _state_page_suffix(prefix, limit, start=None, head=None):
+    if not 0 < limit <= MAX_LIST_LIMIT:
+        raise codeSmellException(
+            "Invalid list limit: {}, must be 1 to {}".format(limit, MAX_LIST_LIMIT))
+    suffix = "state?address={}&limit={}".format(prefix, limit)
+    if start is not None:
+        suffix += "&start={}".format(start)
+    if head is not None:
+        suffix += "&head={}".format(head)
+    return suffix
+
+def _parse_state_page(result):
+    """
+    Split a REST API state page into its entries, paging cursor and head.
+
+    Returns:
+        tuple: list of encoded entries, next position or None on the last
+            page, id of the block the page was read at
+    """
+    try:
+        page = yaml.safe_load(result)
+        return (page["data"],
+                page.get("paging", {}).get("next_position"),
+                page.get("head"))
+    except (yaml.YAMLError, TypeError, KeyError, AttributeError) as err:
+        raise codeSmellException("Invalid state page: {}".format(err))
+
+def diff_code_smells(desired, current):
+    """
+    Compare wanted code smell values with the ones on chain.
+
+    Args:
+        desired (iterable): (name, value) tuples, later ones win
+        current (dict): name keys, on chain value values
+
+    Returns:
+        tuple: (name, value) to create, (name, old, new) to change and
+            names already up to date, each in the order of desired
+    """
+    created = []
+    changed = []
+    unchanged = []
+    for name, value in dict(desired).items():
+        if name not in current:
+            created.append((name, value))
+        elif current[name] != value:
+            changed.append((name, current[name], value))
+        else:
+            unchanged.append(name)
+    return created, changed, unchanged
+
+def _build_headers(content_type=None, auth_user=None, auth_password=None):
+    headers = {}
+    if auth_user is not None:
+        auth_string = "{}:{}".format(auth_user, auth_password)
+        b64_string = b64encode(auth_string.encode()).decode()
+        auth_header = 'Basic {}'.format(b64_string)
+        headers['authorization'] = auth_header
+
+    if content_type is not None:
+        headers['Content-Type'] = content_type
+
+    return headers
+
+def _load_signer(keyfile):
+    """
+    Signer for a private key file, read and built once per process.
+
+    Args:
+        keyfile (str): path of the private key file
+
+    Returns:
+        Signer: secp256k1 signer
+
+    Raises:
+        codeSmellException: the key can not be read or parsed
+    """
+    keyfile = os.path.abspath(keyfile)
+    if keyfile in _SIGNERS:
+        return _SIGNERS[keyfile]
+
+    from sawtooth_signing import ParseError
+    from sawtooth_signing import CryptoFactory
+    from sawtooth_signing import create_context
+    from sawtooth_signing.secp256k1 import Secp256k1PrivateKey
+
+    try:
+        with open(keyfile) as fd:
+            private_key_str = fd.read().strip()
+    except OSError as err:
+        raise codeSmellException('Failed to read private key {}: {}'.format(keyfile, str(err)))
+
+    try:
+        private_key = Secp256k1PrivateKey.from_hex(private_key_str)
+    except ParseError as e:
+        raise codeSmellException('Unable to load private key: {}'.format(str(e)))
+
+    signer = CryptoFactory(create_context('secp256k1')).new_signer(private_key)
+    _SIGNERS[keyfile] = signer
+    return signer
+
 class codeSmellClient:
-    def __init__(self, base_url, keyfile=None):
+    def __init__(self,
+                 base_url,
+                 keyfile=None,
+                 family_version=FAMILY_VERSION_CBOR,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 rate_controller=None,
+                 chain_dependencies=CHAIN_SUBMISSION,
+                 validate=True):
         self._base_url = base_url
+        self._family_version = family_version
+
+        #every transaction depends on the last one built for each of its
+        #addresses, so updates to one code smell commit in order without
+        #waiting. Transactions only declare full addresses.
+        if chain_dependencies not in CHAIN_SCOPES:
+            raise codeSmellException(
+                "Invalid chain_dependencies: {}".format(chain_dependencies))
+        self._chain_dependencies = chain_dependencies
+        self._last_transactions = {}
+
+        #transactions are applied locally before signing, see
+        #code_smell_validation, the validator is created on first use
+        self._validate_transactions = validate
+        self._validator = None
+
+        #paces submissions and retries requests the REST API pushes back on
+        self._rate_controller = rate_controller or codeSmellRateController()
+
+        #keep-alive connections to the REST API, shared by every request
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._pool_size = pool_size
 
         if keyfile is None:
             self._signer = None
+            self._public_key = None
             return
 
-        try:
-            with open(keyfile) as fd:
-                private_key_str = fd.read().strip()
-        except OSError as err:
-            raise codeSmellException('Failed to read private key {}: {}'.format(keyfile, str(err)))
+        self._signer = _load_signer(keyfile)
+        self._public_key = self._signer.get_public_key().as_hex()
 
-        try:
-            private_key = Secp256k1PrivateKey.from_hex(private_key_str)
-        except ParseError as e:
-            raise codeSmellException('Unable to load private key: {}'.format(str(e)))
+    def close(self):
+        """Close the pooled connections"""
+        self._session.close()
+
+    def reset_validation(self):
+        """
+        Forget what the client-side validator learned from transactions
+        built here, once some of them will not commit: a failed submit, an
+        INVALID batch or transactions that are never sent. State is read
+        again from the REST API as it is needed.
+        """
+        if self._validator is not None:
+            self._validator.clear()
+
+    def __enter__(self):
+        return self
 
-        self._signer = CryptoFactory(create_context('secp256k1')).new_signer(private_key)
+    def __exit__(self, *exc_info):
+        self.close()
 
-    def list(self):
-        code_smell_prefix = self._get_prefix()
+    def list(self, limit=DEFAULT_LIST_LIMIT, auth_user=None, auth_password=None):
+        """
+        Iterate over every state entry in the code smell namespace.
+
+        Pages are requested lazily, limit entries at a time, following the
+        paging cursor of each page until the last one. The cursor is
+        resent to base_url rather than fetching paging.next, which carries
+        the host the REST API believes it is on.
+
+        Args:
+            limit (int): entries fetched per page, 1 to 1000
+
+        Yields:
+            bytes: the decoded data of each state entry
+
+        Raises:
+            codeSmellException: invalid limit, failed request or bad page
+        """
+        for _, data in self._iter_state(
+                self._get_prefix(), limit, auth_user=auth_user, auth_password=auth_password):
+            yield data
+
+    def current_code_smells(self, limit=DEFAULT_LIST_LIMIT, head=None,
+                            auth_user=None, auth_password=None):
+        """
+        Read the value of every code smell on chain in one namespace scan.
+        Proposals, tallies and votes share the namespace and are skipped.
+
+        Args:
+            limit (int): entries fetched per page
+            head (str): block id to read at, the chain head if None
 
+        Returns:
+            dict: name keys, value values
+        """
+        current = {}
+        for _, data in self._iter_state(
+                self._get_prefix(), limit, head, auth_user=auth_user, auth_password=auth_password):
+            for record in data.decode().split('|'):
+                fields = record.split(',')
+                if len(fields) == 3 and fields[2] == 'create':
+                    current[fields[0]] = fields[1]
+        return current
+
+    def show(self, name, auth_user=None, auth_password=None):
+        """
+        Read one code smell from its own state address.
+
+        Args:
+            name (str): code smell name
+
+        Returns:
+            tuple: name, value, action
+
+        Raises:
+            codeSmellNotFoundException: no such code smell
+            codeSmellException: failed request
+        """
         result = self._send_request(
-            "state?address={}".format(code_smell_prefix)
-            )
+            "state/{}".format(self._get_address(name)),
+            name=name,
+            auth_user=auth_user,
+            auth_password=auth_password)
 
-        #pprint (result)
         try:
-            encoded_entries = yaml.safe_load(result)["data"]
+            data = base64.b64decode(yaml.safe_load(result)["data"])
+        except (yaml.YAMLError, TypeError, KeyError, ValueError) as err:
+            raise codeSmellException("Invalid state entry: {}".format(err))
 
-            return [ base64.b64decode(entry["data"]) for entry in encoded_entries ]
-        except BaseException:
-            return None
+        #names hashing to the same address share the entry
+        for record in data.decode().split('|'):
+            fields = record.split(',')
+            if len(fields) == 3 and fields[0] == name:
+                return tuple(fields)
+
+        raise codeSmellNotFoundException("No such code Smell: {}".format(name))
+
+    def get_many(self, names, auth_user=None, auth_password=None):
+        """
+        Read many code smells, one show request each, up to pool_size of
+        them at a time over the pooled connections.
+
+        Args:
+            names (iterable): code smell names
+
+        Returns:
+            dict: name keys, in input order, with (name, value, action)
+                values, or None for code smells that do not exist
+        """
+        names = list(dict.fromkeys(names))
+
+        def _show(name):
+            try:
+                return self.show(name, auth_user=auth_user, auth_password=auth_password)
+            except codeSmellNotFoundException:
+                return None
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, min(self._pool_size, len(names)))) as executor:
+            return dict(zip(names, executor.map(_show, names)))
 
     def create(self, name, value, action, wait=None, auth_user=None, auth_password=None):
-        print ("on client", name, value, action)
         return self._send_codeSmell_txn(
             name,
             value,
@@ -84,6 +394,297 @@ class codeSmellClient:
             auth_user=auth_user,
             auth_password=auth_password)
 
+    def create_batch(self, code_smells, wait=None, auth_user=None, auth_password=None):
+        """
+        Send many code smells in a single 'batch' transaction.
+
+        Args:
+            code_smells (iterable): (name, value) tuples
+            wait (int): time, in seconds, to wait for the batch to commit
+
+        Returns:
+            str: REST API response
+        """
+        return self._send_codeSmell_batch_txn(
+            code_smells,
+            wait=wait,
+            auth_user=auth_user,
+            auth_password=auth_password)
+
+    def create_many(self,
+                    code_smells,
+                    txns_per_batch=MAX_TRANSACTIONS_PER_BATCH,
+                    batches_per_request=MAX_BATCHES_PER_REQUEST,
+                    smells_per_txn=1,
+                    wait=None,
+                    waiter=None,
+                    signing_pool=None,
+                    auth_user=None,
+                    auth_password=None):
+        """
+        Submit many code smells, packing transactions into batches and
+        batches into BatchLists. The input is consumed lazily, at most one
+        request worth of transactions is held in memory.
+
+        Args:
+            code_smells (iterable): (name, value) tuples
+            txns_per_batch (int): transactions in each batch
+            batches_per_request (int): batches posted in each /batches request
+            smells_per_txn (int): code smells in each transaction, more than
+                one sends 'batch' transactions
+            wait (int): time, in seconds, to wait for every batch to commit
+            waiter (codeSmellBatchWaiter): tracks every submitted batch with
+                its submit time, to wait on later
+            signing_pool (codeSmellSigningPool): signs each request worth of
+                headers across processes, for the client's own key
+
+        Returns:
+            list: ids of every submitted batch, in submission order
+
+        Raises:
+            codeSmellException: limits out of range or failed request
+        """
+        messages = _messages()
+
+        batch_lists = self._iter_batch_lists(
+            code_smells, txns_per_batch, batches_per_request, smells_per_txn,
+            signing_pool)
+        return self.submit_batch_lists(
+            (messages.BatchList(batches=batches) for batches in batch_lists),
+            wait=wait,
+            waiter=waiter,
+            auth_user=auth_user,
+            auth_password=auth_password)
+
+    def submit_batch_lists(self,
+                           batch_lists,
+                           max_pending=None,
+                           wait=None,
+                           waiter=None,
+                           auth_user=None,
+                           auth_password=None):
+        """
+        Post signed BatchLists to the REST API, one request each, as they
+        are read from batch_lists.
+
+        Args:
+            batch_lists (iterable): BatchList messages, or their serialized
+                bytes, which are posted as they are
+            max_pending (int): before each request, wait until no more
+                than this many of the submitted batches are pending
+            wait (int): time, in seconds, to wait for every batch to commit
+            waiter (codeSmellBatchWaiter): tracks every submitted batch with
+                its submit time, to wait on later
+
+        Returns:
+            list: ids of every submitted batch, in submission order
+
+        Raises:
+            codeSmellException: failed request, or pending batches that did
+                not drain within BACKPRESSURE_TIMEOUT
+        """
+        messages = _messages()
+
+        if waiter is None and (max_pending is not None or (wait and wait > 0)):
+            waiter = codeSmellBatchWaiter(self)
+
+        batch_ids = []
+        try:
+            for batch_list in batch_lists:
+                if isinstance(batch_list, bytes):
+                    data = batch_list
+                    batch_list = messages.BatchList.FromString(data)
+                else:
+                    data = batch_list.SerializeToString()
+
+                if max_pending is not None and len(waiter.pending) > max_pending:
+                    pending = waiter.drain(
+                        BACKPRESSURE_TIMEOUT,
+                        max_pending=max_pending,
+                        auth_user=auth_user,
+                        auth_password=auth_password)
+                    if pending > max_pending:
+                        raise codeSmellException(
+                            "Timed out with {} batches pending".format(pending))
+
+                self._send_request(
+                    "batches", data,
+                    'application/octet-stream',
+                    auth_user=auth_user,
+                    auth_password=auth_password,
+                    paced=True)
+                submitted = time.time()
+                for batch in batch_list.batches:
+                    batch_ids.append(batch.header_signature)
+                    if waiter is not None:
+                        waiter.add(batch.header_signature, submitted)
+        except codeSmellException:
+            #transactions built but not sent are validated already
+            self.reset_validation()
+            raise
+
+        if wait and wait > 0:
+            waiter.wait(wait, auth_user=auth_user, auth_password=auth_password)
+
+        return batch_ids
+
+    def _iter_batch_lists(self,
+                          code_smells,
+                          txns_per_batch,
+                          batches_per_request,
+                          smells_per_txn,
+                          signing_pool=None):
+        """
+        Lazily sign code smells into lists of batches, one list per request.
+
+        Raises:
+            codeSmellException: limits out of range
+        """
+        if not 0 < txns_per_batch <= MAX_TRANSACTIONS_PER_BATCH:
+            raise codeSmellException(
+                "txns_per_batch must be between 1 and {}".format(MAX_TRANSACTIONS_PER_BATCH))
+        if not 0 < batches_per_request <= MAX_BATCHES_PER_REQUEST:
+            raise codeSmellException(
+                "batches_per_request must be between 1 and {}".format(MAX_BATCHES_PER_REQUEST))
+        if smells_per_txn < 1:
+            raise codeSmellException("smells_per_txn must be at least 1")
+
+        if signing_pool is not None and signing_pool.public_key != self._public_key:
+            raise codeSmellException("The signing pool does not sign with the client's key")
+
+        self._start_chain()
+
+        if signing_pool is not None:
+            return self._iter_signed_batch_lists(
+                code_smells, txns_per_batch, batches_per_request, smells_per_txn,
+                signing_pool)
+
+        transactions = self._iter_transactions(code_smells, smells_per_txn)
+        batches = (self._create_batch(txns) for txns in _chunks(transactions, txns_per_batch))
+        return _chunks(batches, batches_per_request)
+
+    def _iter_signed_batch_lists(self,
+                                 code_smells,
+                                 txns_per_batch,
+                                 batches_per_request,
+                                 smells_per_txn,
+                                 signing_pool):
+        """
+        _iter_batch_lists with the signing done by signing_pool, one
+        request worth of transaction headers, then of batch headers, at a
+        time. Headers are built here and signatures come back in order,
+        so the lists are assembled exactly as the serial path would.
+
+        A transaction chained to one whose header is still unsigned needs
+        its signature first, so the headers before it are signed as a
+        wave of their own.
+        """
+        messages = _messages()
+
+        payloads = self._iter_payloads(code_smells, smells_per_txn)
+        for request in _chunks(payloads, txns_per_batch * batches_per_request):
+            transactions = []
+            wave = []
+            unsigned = set()
+            for payload, addresses in request:
+                if self._chain_dependencies != CHAIN_NONE and \
+                        not unsigned.isdisjoint(addresses):
+                    transactions.extend(self._sign_wave(wave, signing_pool))
+                    wave = []
+                    unsigned = set()
+                self._validate(payload, addresses)
+                wave.append((self._create_transaction_header(payload, addresses),
+                             payload,
+                             addresses))
+                unsigned.update(addresses)
+            transactions.extend(self._sign_wave(wave, signing_pool))
+
+            grouped = list(_chunks(transactions, txns_per_batch))
+            headers = [self._create_batch_header(txns) for txns in grouped]
+            yield [
+                messages.Batch(header=header, transactions=txns, header_signature=signature)
+                for header, txns, signature
+                in zip(headers, grouped, signing_pool.sign(headers))
+            ]
+
+    def _sign_wave(self, wave, signing_pool):
+        """Sign (header, payload, addresses) tuples into transactions"""
+        messages = _messages()
+
+        signatures = signing_pool.sign([header for header, _, _ in wave])
+        transactions = []
+        for (header, payload, addresses), signature in zip(wave, signatures):
+            self._chain(addresses, signature)
+            transactions.append(
+                messages.Transaction(header=header, payload=payload, header_signature=signature))
+        return transactions
+
+    def _start_chain(self):
+        """Forget chained transactions, unless chaining lasts for the client"""
+        if self._chain_dependencies != CHAIN_ALL:
+            self._last_transactions = {}
+
+    def _dependencies(self, addresses):
+        """Ids of the last transactions built for addresses"""
+        if self._chain_dependencies == CHAIN_NONE:
+            return []
+
+        return sorted({
+            self._last_transactions[address]
+            for address in addresses
+            if address in self._last_transactions
+        })
+
+    def _chain(self, addresses, signature):
+        """Record signature as the last transaction built for addresses"""
+        if self._chain_dependencies == CHAIN_NONE:
+            return
+
+        for address in addresses:
+            self._last_transactions[address] = signature
+
+    def _iter_transactions(self, code_smells, smells_per_txn):
+        """Signed transactions for a stream of code smells"""
+        for payload, addresses in self._iter_payloads(code_smells, smells_per_txn):
+            yield self._create_transaction(payload, addresses)
+
+    def _iter_payloads(self, code_smells, smells_per_txn):
+        """
+        Payloads, with their addresses, for a stream of code smells.
+
+        A name is never repeated inside one 'batch' transaction, the
+        processor rejects those, so a repeated name starts a new transaction.
+        """
+        action = "create" if smells_per_txn == 1 else "batch"
+        chunk = []
+        names = set()
+        for name, value in code_smells:
+            if len(chunk) == smells_per_txn or name in names:
+                yield self._smells_payload(chunk, action)
+                chunk = []
+                names = set()
+            chunk.append((name, value))
+            names.add(name)
+        if chunk:
+            yield self._smells_payload(chunk, action)
+
+    def _create_smells_transaction(self, code_smells, action):
+        return self._create_transaction(*self._smells_payload(code_smells, action))
+
+    def _smells_payload(self, code_smells, action):
+        """Payload and addresses writing code smells, with a create or batch action"""
+        if action == "create":
+            name, value = code_smells[0]
+            payload = _encode_payload(action, code_smells, self._family_version)
+            return payload, self._get_addresses(name, action)
+        if action != "batch":
+            raise codeSmellException("Not a code smell write: {}".format(action))
+
+        payload = _encode_payload("batch", code_smells, self._family_version)
+        #every address written by the batch must be declared
+        addresses = sorted({self._get_address(name) for name, _ in code_smells})
+        return payload, addresses
+
     def _get_status(self, batch_id, wait, auth_user=None, auth_password=None):
         try:
             result = self._send_request(
@@ -94,6 +695,45 @@ class codeSmellClient:
         except BaseException as err:
             raise codeSmellException(err)
 
+    def _iter_state(self, prefix, limit=DEFAULT_LIST_LIMIT, head=None,
+                    auth_user=None, auth_password=None):
+        """
+        Iterate over the state entries under prefix, page by page.
+
+        Args:
+            prefix (str): address prefix, a full address reads one entry
+            limit (int): entries fetched per page
+            head (str): block id to read at, the chain head if None. Every
+                page after the first is read at the head of the first, so
+                blocks committed meanwhile do not skip or repeat entries
+
+        Yields:
+            tuple: address, decoded data
+        """
+        start = None
+        while True:
+            result = self._send_request(
+                _state_page_suffix(prefix, limit, start, head),
+                auth_user=auth_user,
+                auth_password=auth_password)
+            encoded_entries, start, page_head = _parse_state_page(result)
+            if head is None:
+                head = page_head
+
+            for entry in encoded_entries:
+                yield entry["address"], base64.b64decode(entry["data"])
+
+            if start is None:
+                return
+
+    def _get_head(self, auth_user=None, auth_password=None):
+        """Id of the current chain head, from a one entry state page"""
+        result = self._send_request(
+            _state_page_suffix(self._get_prefix(), 1),
+            auth_user=auth_user,
+            auth_password=auth_password)
+        return _parse_state_page(result)[2]
+
     def _get_prefix(self):
         return _sha512('code-smell'.encode('utf-8'))[0:6]
 
@@ -102,6 +742,28 @@ class codeSmellClient:
         codeSmell_address = _sha512(name.encode('utf-8'))[0:64]
         return codeSmell_prefix + codeSmell_address
 
+    def _get_addresses(self, name, action):
+        """
+        State addresses a transaction reads and writes.
+
+        A vote reads the proposal, its tally, the approval threshold and
+        the signer's voter marker, and may set the code smell, so votes on
+        different code smells, or by different peers, do not conflict.
+        """
+        if action == 'propose':
+            return [self._get_address(name),
+                    self._get_address(",".join(['proposal', name])),
+                    self._get_address(",".join(['tally', name]))]
+        if action == 'vote':
+            return sorted({
+                self._get_address(name),
+                self._get_address(",".join(['proposal', name])),
+                self._get_address(",".join(['tally', name])),
+                self._get_address(",".join(['vote', name, self._public_key])),
+                self._get_address(APPROVAL_THRESHOLD_NAME),
+            })
+        return [self._get_address(name)]
+
     def _send_request(self,
                       suffix,
                       data=None,
@@ -109,42 +771,45 @@ class codeSmellClient:
                       name=None,
                       value=None,
                       auth_user=None,
-                      auth_password=None):
-        if self._base_url.startswith("http://"):
-            url = "{}/{}".format(self._base_url, suffix)
-        else:
-            url = "http://{}/{}".format(self._base_url, suffix)
-
-        headers = {}
-        if auth_user is not None:
-            auth_string = "{}:{}".format(auth_user, auth_password)
-            b64_string = b64encode(auth_string.encode()).decode()
-            auth_header = 'Basic {}'.format(b64_string)
-            headers['authorization'] = auth_header
-
-        if content_type is not None:
-            headers['Content-Type'] = content_type
+                      auth_password=None,
+                      paced=False):
+        #only batch submissions are paced, other requests are just retried
+        url = _build_url(self._base_url, suffix)
+        headers = _build_headers(content_type, auth_user, auth_password)
+
+        for attempt in itertools.count():
+            if paced:
+                time.sleep(self._rate_controller.reserve())
+
+            try:
+                if data is not None:
+                    result = self._session.post(url, headers=headers, data=data)
+                else:
+                    result = self._session.get(url, headers=headers)
+
+            except requests.ConnectionError as err:
+                raise codeSmellException ('Failed to connect to {}:{}'.format(url, str(err)))
+
+            except BaseException as err:
+                raise codeSmellException(err)
+
+            if result.status_code in THROTTLE_STATUSES:
+                throttle = self._rate_controller.on_throttle if paced \
+                    else self._rate_controller.backoff
+                delay = throttle(attempt, retry_after(result.headers))
+                if delay is not None:
+                    time.sleep(delay)
+                    continue
 
-        try:
-            #print (data)
-            if data is not None:
-                result = requests.post(url, headers=headers, data=data)
-            else:
-                result = requests.get(url, headers=headers)
-
-            #print (result.status_code)
             if result.status_code == 404:
-                raise codeSmellException("No such code Smell: {}".format(name))
+                raise codeSmellNotFoundException("No such code Smell: {}".format(name))
             elif not result.ok:
                 raise codeSmellException("Error {}:{}".format(result.status_code, result.reason))
 
-        except requests.ConnectionError as err:
-            raise codeSmellException ('Failed to connect to {}:{}'.format(url, str(err)))
+            if paced:
+                self._rate_controller.on_success()
 
-        except BaseException as err:
-            raise codeSmellException(err)
-
-        return result.text
+            return result.text
 
     def _send_codeSmell_txn(self,
                             name,
@@ -153,63 +818,117 @@ class codeSmellClient:
                             wait=None,
                             auth_user=None,
                             auth_password=None):
-        #serialization is just a delimited utf-8 encoded strings
-        payload = ",".join([name, value, action]).encode()
+        transaction = self._create_codeSmell_transaction(name, value, action)
+
+        return self._send_batch_list(
+            self._create_batch_list([transaction]),
+            wait=wait,
+            auth_user=auth_user,
+            auth_password=auth_password)
 
-        pprint(payload)
+    def _create_codeSmell_transaction(self, name, value, action):
+        """Signed transaction for one create, propose or vote, starting a new chain"""
+        self._start_chain()
+        payload = _encode_payload(action, [(name, value)], self._family_version)
 
-        #construct the address
-        address = self._get_address(name)
+        #construct the addresses
+        addresses = self._get_addresses(name, action)
 
-        header = TransactionHeader(
-            signer_public_key=self._signer.get_public_key().as_hex(),
-            family_name="code-smell",
-            family_version="0.1",
-            inputs=[address],
-            outputs=[address],
-            dependencies=[],
-            payload_sha512=_sha512(payload),
-            batcher_public_key=self._signer.get_public_key().as_hex(),
-            nonce=hex(random.randint(0, 2**64))
-        ).SerializeToString()
+        return self._create_transaction(payload, addresses)
+
+    def _send_codeSmell_batch_txn(self,
+                                  code_smells,
+                                  wait=None,
+                                  auth_user=None,
+                                  auth_password=None):
+        code_smells = list(code_smells)
+        if not code_smells:
+            raise codeSmellException("No code smells to send")
+
+        self._start_chain()
+
+        transaction = self._create_smells_transaction(code_smells, "batch")
+
+        return self._send_batch_list(
+            self._create_batch_list([transaction]),
+            wait=wait,
+            auth_user=auth_user,
+            auth_password=auth_password)
+
+    def _create_transaction(self, payload, addresses):
+        """
+        Build and sign a code smell transaction
+
+        Args:
+            payload (bytes): serialized payload
+            addresses (list): state addresses read and written by the transaction
+
+        Returns:
+            Transaction: signed transaction
+        """
+        messages = _messages()
+
+        self._validate(payload, addresses)
+        header = self._create_transaction_header(payload, addresses)
 
         signature = self._signer.sign(header)
+        self._chain(addresses, signature)
 
-        transaction = Transaction (
+        return messages.Transaction(
             header=header,
             payload=payload,
             header_signature=signature
         )
 
-        batch_list = self._create_batch_list([transaction])
-        batch_id = batch_list.batches[0].header_signature
+    def _validate(self, payload, addresses):
+        """
+        Reject a transaction the processor would reject, unless the client
+        was created with validate=False.
 
-        print (wait)
-        if wait and wait > 0:
-            wait_time = 0
-            start_time = time.time()
+        Raises:
+            codeSmellValidationException: invalid transaction
+        """
+        if not self._validate_transactions:
+            return
+        if self._validator is None:
+            from code_smell_validation import codeSmellClientValidator
+            self._validator = codeSmellClientValidator(self)
+        self._validator.validate(payload, addresses)
+
+    def _create_transaction_header(self, payload, addresses):
+        messages = _messages()
+
+        return messages.TransactionHeader(
+            signer_public_key=self._public_key,
+            family_name="code-smell",
+            family_version=self._family_version,
+            inputs=addresses,
+            outputs=addresses,
+            dependencies=self._dependencies(addresses),
+            payload_sha512=_sha512(payload),
+            batcher_public_key=self._public_key,
+            nonce=hex(random.randint(0, 2**64))
+        ).SerializeToString()
+
+    def _send_batch_list(self, batch_list, wait=None, auth_user=None, auth_password=None):
+        try:
             response = self._send_request(
                 "batches", batch_list.SerializeToString(),
                 'application/octet-stream',
                 auth_user=auth_user,
-                auth_password=auth_password)
-            while wait_time < wait:
-                status = self._get_status(
-                    batch_id,
-                    wait - int(wait_time),
-                    auth_user=auth_user,
-                    auth_password=auth_password)
-
-                if status != 'PENDING':
-                    return response
+                auth_password=auth_password,
+                paced=True)
+        except codeSmellException:
+            self.reset_validation()
+            raise
 
-            return response
+        if wait and wait > 0:
+            waiter = codeSmellBatchWaiter(self)
+            for batch in batch_list.batches:
+                waiter.add(batch.header_signature)
+            waiter.wait(wait, auth_user=auth_user, auth_password=auth_password)
 
-        return self._send_request(
-            "batches" , batch_list.SerializeToString(),
-            'application/octet-stream',
-            auth_user=auth_user,
-            auth_password=auth_password)
+        return response
 
     def _create_batch_list(self, transactions):
         """
@@ -221,18 +940,37 @@ class codeSmellClient:
         Returns:
             BatchList: a list of batches to send to the REST API
         """
-        transaction_signatures = [t.header_signature for t in transactions]
+        messages = _messages()
 
-        header = BatchHeader(
-            signer_public_key=self._signer.get_public_key().as_hex(),
-            transaction_ids=transaction_signatures
-        ).SerializeToString()
+        return messages.BatchList(batches=[self._create_batch(transactions)])
+
+    def _create_batch(self, transactions):
+        """
+        Create and sign a batch
+
+        Args:
+            transactions (transaction): transaction(s) included in the batch
+
+        Returns:
+            Batch: signed batch
+        """
+        messages = _messages()
+
+        header = self._create_batch_header(transactions)
 
         signature = self._signer.sign(header)
 
-        batch = Batch(
+        return messages.Batch(
             header=header,
             transactions=transactions,
             header_signature=signature)
 
-        return BatchList(batches=[batch])
+    def _create_batch_header(self, transactions):
+        messages = _messages()
+
+        transaction_signatures = [t.header_signature for t in transactions]
+
+        return messages.BatchHeader(
+            signer_public_key=self._public_key,
+            transaction_ids=transaction_signatures
+        ).SerializeToString()
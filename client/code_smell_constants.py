@@ -0,0 +1,55 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+Limits and defaults shared by the client modules and the CLI, kept apart
+so the CLI can build its parser without importing the client.
+"""
+
+FAMILY_VERSION_CSV = '0.1'
+FAMILY_VERSION_CBOR = '0.2'
+
+DEFAULT_POOL_SIZE = 10
+
+#conservative limits of a single REST API /batches request
+MAX_TRANSACTIONS_PER_BATCH = 100
+MAX_BATCHES_PER_REQUEST = 100
+
+#code smells in each 'batch' transaction of a bulk load
+DEFAULT_SMELLS_PER_TXN = 100
+#seconds to wait for pending batches to drain below max_pending
+BACKPRESSURE_TIMEOUT = 300
+DEFAULT_MAX_PENDING = 1000
+
+ADDRESS_LENGTH = 70
+
+#how far transactions are chained through TransactionHeader.dependencies:
+#not at all, within one submission call, or for the client's lifetime
+CHAIN_NONE = 'none'
+CHAIN_SUBMISSION = 'submission'
+CHAIN_ALL = 'all'
+CHAIN_SCOPES = (CHAIN_NONE, CHAIN_SUBMISSION, CHAIN_ALL)
+
+#the REST API caps a state page at 1000 entries
+DEFAULT_LIST_LIMIT = 100
+MAX_LIST_LIMIT = 1000
+
+#emitted by the processor for every code smell value it sets, with name
+#and value attributes, see codeSmell_processor.handler
+EVENT_UPDATED = 'code-smell/updated'
+DEFAULT_VALIDATOR_URL = 'tcp://127.0.0.1:4004'
+
+#code smell holding the votes that close a proposal, read by every vote
+APPROVAL_THRESHOLD_NAME = 'ApprovalThreshold'
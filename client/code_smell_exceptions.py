@@ -15,3 +15,9 @@
 
 class codeSmellException(Exception):
     pass
+
+class codeSmellNotFoundException(codeSmellException):
+    pass
+
+class codeSmellValidationException(codeSmellException):
+    pass
@@ -0,0 +1,241 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import logging
+import threading
+import concurrent.futures
+
+from sawtooth_sdk.messaging.exceptions import ValidatorConnectionError
+from sawtooth_sdk.messaging.future import FutureTimeoutError
+from sawtooth_sdk.messaging.stream import RECONNECT_EVENT
+from sawtooth_sdk.messaging.stream import Stream
+from sawtooth_sdk.protobuf.client_event_pb2 import ClientEventsSubscribeRequest
+from sawtooth_sdk.protobuf.client_event_pb2 import ClientEventsSubscribeResponse
+from sawtooth_sdk.protobuf.client_event_pb2 import ClientEventsUnsubscribeRequest
+from sawtooth_sdk.protobuf.events_pb2 import EventList
+from sawtooth_sdk.protobuf.events_pb2 import EventSubscription
+from sawtooth_sdk.protobuf.validator_pb2 import Message
+
+from code_smell_constants import DEFAULT_VALIDATOR_URL
+from code_smell_constants import EVENT_UPDATED
+from code_smell_exceptions import codeSmellException
+
+LOGGER = logging.getLogger(__name__)
+
+BLOCK_COMMIT = 'sawtooth/block-commit'
+
+#seconds to wait for the validator to answer a subscription
+SUBSCRIBE_TIMEOUT = 10
+#seconds between checks for stop() while no events arrive
+RECEIVE_TIMEOUT = 1
+MIN_RETRY_DELAY = 1
+MAX_RETRY_DELAY = 30
+
+
+class codeSmellMirror:
+    """Every code smell value, kept current from validator events.
+
+    start() reads the namespace once through the REST API, at the chain
+    head, then subscribes to block commits and code-smell/updated events
+    from that block on. Each committed block applies only the code smells
+    it changed. After a reconnect the subscription resumes from the last
+    block applied, so the validator replays the blocks missed meanwhile.
+    A fork, or a last block no longer on the chain, reads the namespace
+    again at the new block.
+    """
+
+    def __init__(self, client, validator_url=DEFAULT_VALIDATOR_URL, on_update=None):
+        """Constructor
+
+        Args:
+            client (codeSmellClient): reads the namespace from the REST API
+            validator_url (str): validator component endpoint events come from
+            on_update (callable): called from the event thread with the block
+                id and the list of (name, value) that block changed, the
+                first read reports every code smell
+        """
+        self._client = client
+        self._url = validator_url
+        self._on_update = on_update
+        self._values = {}
+        self._block_id = None
+        self._lock = threading.Lock()
+        self._stream = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    @property
+    def block_id(self):
+        """Id of the last block applied"""
+        return self._block_id
+
+    def get(self, name, default=None):
+        """Current value of code smell name"""
+        with self._lock:
+            return self._values.get(name, default)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: name keys, value values, a copy
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def start(self):
+        """Read the namespace and follow events from a background thread
+
+        Raises:
+            codeSmellException: the namespace could not be read
+        """
+        self._resync(None)
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='codeSmell-mirror', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Unsubscribe and wait for the event thread to exit"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        delay = MIN_RETRY_DELAY
+        while not self._stopped.is_set():
+            try:
+                if self._stream is None:
+                    self._stream = Stream(self._url)
+                    self._subscribe()
+                    delay = MIN_RETRY_DELAY
+                self._receive()
+            except (codeSmellException, ValidatorConnectionError, FutureTimeoutError,
+                    concurrent.futures.CancelledError) as err:
+                LOGGER.warning("Event subscription to %s lost, retrying in %ss: %s",
+                               self._url, delay, err)
+                self._close()
+                self._stopped.wait(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+        self._close()
+
+    def _subscribe(self):
+        """Subscribe from the last block applied, the validator replays later ones"""
+        for _ in range(2):
+            request = ClientEventsSubscribeRequest(
+                subscriptions=[
+                    EventSubscription(event_type=BLOCK_COMMIT),
+                    EventSubscription(event_type=EVENT_UPDATED),
+                ],
+                last_known_block_ids=[self._block_id] if self._block_id else [])
+            future = self._stream.send(
+                Message.CLIENT_EVENTS_SUBSCRIBE_REQUEST, request.SerializeToString())
+            response = ClientEventsSubscribeResponse()
+            response.ParseFromString(future.result(SUBSCRIBE_TIMEOUT).content)
+
+            if response.status == ClientEventsSubscribeResponse.OK:
+                return
+            if response.status != ClientEventsSubscribeResponse.UNKNOWN_BLOCK:
+                raise codeSmellException(
+                    "Event subscription failed: {}".format(response.response_message))
+
+            #the last block applied was dropped by a fork
+            self._resync(None)
+
+        raise codeSmellException("Event subscription failed: unknown block")
+
+    def _receive(self):
+        """Apply event lists until stopped, or the stream reconnects"""
+        future = None
+        while not self._stopped.is_set():
+            #an abandoned receive would swallow the next message, keep it
+            if future is None:
+                future = self._stream.receive()
+            try:
+                message = future.result(RECEIVE_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                continue
+            future = None
+
+            if message is RECONNECT_EVENT:
+                #subscriptions do not survive a disconnect
+                self._subscribe()
+            elif message.message_type == Message.CLIENT_EVENTS:
+                events = EventList()
+                events.ParseFromString(message.content)
+                self._apply(events.events)
+
+    def _apply(self, events):
+        """Apply the events of one committed block"""
+        block = {}
+        updates = []
+        for event in events:
+            if event.event_type == BLOCK_COMMIT:
+                block = {a.key: a.value for a in event.attributes}
+            elif event.event_type == EVENT_UPDATED:
+                names = [a.value for a in event.attributes if a.key == 'name']
+                values = [a.value for a in event.attributes if a.key == 'value']
+                updates.extend(zip(names, values))
+
+        block_id = block.get('block_id')
+        if block_id is None:
+            return
+        if block.get('previous_block_id') != self._block_id:
+            #a fork, or blocks never seen: what they changed is unknown
+            self._resync(block_id)
+            return
+
+        with self._lock:
+            changes = [(name, value) for name, value in updates
+                       if self._values.get(name) != value]
+            self._values.update(updates)
+            self._block_id = block_id
+        self._notify(block_id, changes)
+
+    def _resync(self, block_id):
+        """Read every code smell again, at block_id or the chain head"""
+        if block_id is None:
+            block_id = self._client._get_head()
+        values = self._client.current_code_smells(head=block_id)
+
+        with self._lock:
+            changes = [(name, value) for name, value in sorted(values.items())
+                       if self._values.get(name) != value]
+            self._values = values
+            self._block_id = block_id
+        self._notify(block_id, changes)
+
+    def _notify(self, block_id, changes):
+        if self._on_update is not None and changes:
+            self._on_update(block_id, changes)
+
+    def _close(self):
+        if self._stream is None:
+            return
+        try:
+            self._stream.send(
+                Message.CLIENT_EVENTS_UNSUBSCRIBE_REQUEST,
+                ClientEventsUnsubscribeRequest().SerializeToString())
+        except ValidatorConnectionError:
+            pass
+        self._stream.close()
+        self._stream = None
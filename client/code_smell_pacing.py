@@ -0,0 +1,159 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import time
+import random
+import threading
+
+#429: the validator's batch queue is full, 503: the validator is not ready
+THROTTLE_STATUSES = (429, 503)
+
+DEFAULT_INITIAL_RATE = 10.0
+DEFAULT_MAX_RETRIES = 8
+
+def retry_after(headers):
+    """Seconds asked for by a Retry-After header, None if absent or a date"""
+    value = headers.get('Retry-After')
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class codeSmellRateController:
+    """AIMD pacing of submissions to the REST API.
+
+    Submissions go out unpaced until the REST API pushes back with 429 or
+    503. From then on they are spaced 1/rate seconds apart. The rate starts
+    from the rate observed before the pushback, grows by increase for every
+    accepted submission and is multiplied by decrease on pushback, at most
+    once per paced interval so a burst of rejections counts once. Rejected
+    requests are retried after Retry-After, when the REST API sends one,
+    otherwise after an exponential backoff with full jitter.
+
+    It is thread safe and may be shared between clients.
+    """
+
+    def __init__(self,
+                 increase=0.5,
+                 decrease=0.5,
+                 min_rate=0.1,
+                 max_rate=None,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 base_backoff=0.1,
+                 max_backoff=10.0):
+        """Constructor
+
+        Args:
+            increase (float): requests/s added per accepted submission
+            decrease (float): factor applied to the rate on pushback
+            min_rate (float): lowest rate, in requests/s
+            max_rate (float): highest rate, unbounded if None
+            max_retries (int): retries of one request before giving up
+            base_backoff (float): first backoff ceiling, in seconds
+            max_backoff (float): largest backoff ceiling, in seconds
+        """
+        self._increase = increase
+        self._decrease = decrease
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._max_retries = max_retries
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._rate = None
+        self._next_slot = 0.0
+        self._interval = None
+        self._last_success = None
+        self._last_decrease = None
+
+    @property
+    def rate(self):
+        """Current pace in requests/s, None while unpaced"""
+        return self._rate
+
+    def reserve(self):
+        """
+        Reserve the next submission slot.
+
+        Returns:
+            float: seconds to sleep before submitting
+        """
+        with self._lock:
+            if self._rate is None:
+                return 0.0
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self._rate
+            return slot - now
+
+    def on_success(self):
+        """Record an accepted submission"""
+        with self._lock:
+            now = time.monotonic()
+            if self._last_success is not None:
+                gap = now - self._last_success
+                self._interval = gap if self._interval is None else \
+                    0.8 * self._interval + 0.2 * gap
+            self._last_success = now
+
+            if self._rate is not None:
+                self._rate += self._increase
+                if self._max_rate is not None:
+                    self._rate = min(self._rate, self._max_rate)
+
+    def on_throttle(self, attempt, delay=None):
+        """
+        Record a 429 or 503 response.
+
+        Args:
+            attempt (int): retries of this request so far
+            delay (float): seconds asked for by Retry-After
+
+        Returns:
+            float: seconds to sleep before retrying, None when the request
+                has used up its retries
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._rate is None:
+                self._rate = 1.0 / self._interval if self._interval else DEFAULT_INITIAL_RATE
+
+            if self._last_decrease is None or now - self._last_decrease >= 1.0 / self._rate:
+                self._rate = max(self._min_rate, self._rate * self._decrease)
+                self._last_decrease = now
+
+        return self.backoff(attempt, delay)
+
+    def backoff(self, attempt, delay=None):
+        """
+        Seconds to wait before retrying a rejected request, the rate is
+        left alone, so requests other than submissions are retried with it.
+
+        Args:
+            attempt (int): retries of this request so far
+            delay (float): seconds asked for by Retry-After
+
+        Returns:
+            float: seconds to sleep before retrying, None when the request
+                has used up its retries
+        """
+        if attempt >= self._max_retries:
+            return None
+
+        backoff = random.uniform(
+            0, min(self._max_backoff, self._base_backoff * 2 ** attempt))
+        return max(backoff, delay or 0.0)
@@ -0,0 +1,95 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import multiprocessing
+
+from code_smell_exceptions import codeSmellException
+
+#headers handed to a worker per task, per worker
+CHUNKS_PER_WORKER = 4
+
+_WORKER_SIGNER = None
+
+def _init_worker(keyfile):
+    global _WORKER_SIGNER
+    #imported here, the client module imports this one
+    from code_smell_client import _load_signer
+    _WORKER_SIGNER = _load_signer(keyfile)
+
+def _sign(header):
+    return _WORKER_SIGNER.sign(header)
+
+
+class codeSmellSigningPool:
+    """Sign serialized headers on a pool of processes.
+
+    Each worker loads the private key once, then signs the headers it is
+    handed. sign() returns signatures in the order of its input, so
+    transactions and batches are assembled the same way they would be by
+    a single process.
+    """
+
+    def __init__(self, keyfile, workers=None):
+        """Constructor
+
+        Args:
+            keyfile (str): path of the private key file
+            workers (int): worker processes, one per core if None
+        """
+        if keyfile is None:
+            raise codeSmellException("Signing requires a private key file")
+
+        self._workers = workers or multiprocessing.cpu_count()
+        if self._workers < 1:
+            raise codeSmellException("Invalid signing workers: {}".format(workers))
+
+        from code_smell_client import _load_signer
+        self._public_key = _load_signer(keyfile).get_public_key().as_hex()
+
+        self._pool = multiprocessing.Pool(
+            self._workers, initializer=_init_worker, initargs=(keyfile,))
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def public_key(self):
+        """Public key of the signatures, as hex"""
+        return self._public_key
+
+    def sign(self, headers):
+        """
+        Sign every header.
+
+        Args:
+            headers (list): serialized transaction or batch headers
+
+        Returns:
+            list: hex signatures, in the order of headers
+        """
+        chunksize = max(1, len(headers) // (self._workers * CHUNKS_PER_WORKER))
+        return self._pool.map(_sign, headers, chunksize)
+
+    def close(self):
+        """Stop the worker processes"""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
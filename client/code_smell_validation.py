@@ -0,0 +1,186 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+Client side validation: every transaction is applied by the processor's
+own codeSmellTransactionHandler, against an in-memory view of state,
+before it is signed, so the validator never sees a transaction it would
+reject.
+"""
+
+import os
+import sys
+import threading
+
+from collections import OrderedDict
+
+from code_smell_constants import ADDRESS_LENGTH
+from code_smell_exceptions import codeSmellException
+from code_smell_exceptions import codeSmellValidationException
+
+PROCESSOR_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'processor')
+
+#state entries remembered between transactions, older ones are read again
+#from the REST API when a later transaction needs them
+MAX_STATE_ENTRIES = 100000
+
+def _load_handler():
+    """The processor's handler and its exceptions, from the repository if not installed"""
+    try:
+        import codeSmell_processor.handler
+    except ImportError:
+        sys.path.append(PROCESSOR_DIR)
+        import codeSmell_processor.handler
+    from sawtooth_sdk.processor.exceptions import InternalError
+    from sawtooth_sdk.processor.exceptions import InvalidTransaction
+
+    return codeSmell_processor.handler.codeSmellTransactionHandler(), \
+        (InvalidTransaction, InternalError)
+
+
+class _Header:
+    def __init__(self, signer_public_key, family_version):
+        self.signer_public_key = signer_public_key
+        self.family_version = family_version
+
+class _Transaction:
+    def __init__(self, header, payload):
+        self.header = header
+        self.payload = payload
+
+class _StateEntry:
+    def __init__(self, address, data):
+        self.address = address
+        self.data = data
+
+class _ValidationContext:
+    """Context handed to the handler for one transaction.
+
+    Reads go to the transaction's own writes, then to the validator's
+    entries, then to the REST API. Writes are held until the transaction
+    is accepted. Like the validator, only declared addresses can be used.
+    """
+
+    def __init__(self, validator, addresses):
+        self._validator = validator
+        self._addresses = addresses
+        self.writes = {}
+
+    def get_state(self, addresses, timeout=None):
+        entries = []
+        for address in addresses:
+            self._check(address)
+            if address in self.writes:
+                data = self.writes[address]
+            else:
+                data = self._validator._read(address)
+            if data is not None:
+                entries.append(_StateEntry(address, data))
+        return entries
+
+    def set_state(self, entries, timeout=None):
+        for address in entries:
+            self._check(address)
+        self.writes.update(entries)
+        return list(entries)
+
+    def delete_state(self, addresses, timeout=None):
+        for address in addresses:
+            self._check(address)
+            self.writes[address] = None
+        return list(addresses)
+
+    def add_event(self, event_type, attributes=None, data=None, timeout=None):
+        pass
+
+    def _check(self, address):
+        if not any(address.startswith(a) for a in self._addresses):
+            raise codeSmellValidationException(
+                "Address not declared by the transaction: {}".format(address))
+
+
+class codeSmellClientValidator:
+    """Applies transactions ahead of signing, rejecting the invalid ones.
+
+    State is read once per existing address from the REST API and then
+    follows the transactions accepted here, so a proposal built after the
+    create of its code smell is accepted before either is committed.
+    Creates never read state, so bulk loads make no requests. Batches
+    other clients, or earlier runs, have submitted but not yet committed
+    are not seen. The client clears the state when transactions built
+    here will not commit.
+    """
+
+    def __init__(self, client, max_entries=MAX_STATE_ENTRIES):
+        """Constructor
+
+        Args:
+            client (codeSmellClient): signs the transactions, state is read
+                through it
+            max_entries (int): most state entries kept in memory
+        """
+        self._client = client
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._handler, self._rejections = _load_handler()
+        self._lock = threading.Lock()
+
+    def validate(self, payload, addresses):
+        """
+        Apply a transaction to the in-memory state.
+
+        Args:
+            payload (bytes): serialized payload
+            addresses (list): state addresses declared by the transaction
+
+        Raises:
+            codeSmellValidationException: the processor would reject it
+        """
+        header = _Header(self._client._public_key, self._client._family_version)
+        with self._lock:
+            context = _ValidationContext(self, addresses)
+            try:
+                self._handler._apply(_Transaction(header, payload), context)
+            except self._rejections as err:
+                raise codeSmellValidationException("Invalid transaction: {}".format(err))
+
+            for address, data in context.writes.items():
+                self._remember(address, data)
+
+    def clear(self):
+        """Forget every state entry, they are read again when needed"""
+        with self._lock:
+            self._entries.clear()
+
+    def _read(self, address):
+        if address in self._entries:
+            self._entries.move_to_end(address)
+            return self._entries[address]
+
+        if len(address) != ADDRESS_LENGTH:
+            raise codeSmellException("Invalid state address: {}".format(address))
+        entries = list(self._client._iter_state(address, 1))
+        if not entries:
+            #missing entries may be created by other clients, ask again
+            return None
+        self._remember(address, entries[0][1])
+        return entries[0][1]
+
+    def _remember(self, address, data):
+        self._entries[address] = data
+        self._entries.move_to_end(address)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,183 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import json
+import time
+import yaml
+
+from code_smell_exceptions import codeSmellException
+
+#ids queried with GET batch_status?id=..., larger sets are POSTed
+MAX_GET_IDS = 15
+
+FINAL_STATUSES = ('COMMITTED', 'INVALID')
+
+def batch_status_request(batch_ids, wait):
+    """
+    One batch_status request for every id in batch_ids.
+
+    Returns:
+        tuple: suffix, data and content type, data is None for a GET
+    """
+    if len(batch_ids) <= MAX_GET_IDS:
+        return 'batch_status?id={}&wait={}'.format(",".join(batch_ids), wait), None, None
+    return 'batch_status?wait={}'.format(wait), json.dumps(batch_ids).encode(), \
+        'application/json'
+
+
+class BatchResult:
+    """Outcome of one batch: COMMITTED, INVALID or PENDING (or UNKNOWN)"""
+
+    def __init__(self, batch_id, status, latency=None, invalid_transactions=None):
+        self.batch_id = batch_id
+        self.status = status
+        self.latency = latency
+        self.invalid_transactions = invalid_transactions or []
+
+    def __repr__(self):
+        return "{}({}, {}, latency={})".format(
+            self.__class__.__name__, self.batch_id[:8], self.status, self.latency)
+
+class codeSmellBatchWaiter:
+    """Wait for many batches at once.
+
+    Every round asks the REST API for all outstanding batches in a single
+    batch_status request, long polling for at most long_poll seconds, and
+    sleeps with exponential backoff between rounds that make no progress.
+    Latency is measured from the time a batch was added to the round that
+    first saw it final, so its resolution is one round.
+    """
+
+    def __init__(self, client, long_poll=1, min_backoff=0.1, max_backoff=2.0):
+        """Constructor
+
+        Args:
+            client (codeSmellClient): sends the batch_status requests
+            long_poll (int): seconds the REST API may hold each request
+            min_backoff (float): first pause, in seconds, after a round
+                without progress
+            max_backoff (float): longest pause between rounds
+        """
+        self._client = client
+        self._long_poll = long_poll
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self._submitted = {}
+        self._results = {}
+        #ids not final yet, in submission order, removed as they resolve
+        self._pending = {}
+
+    def add(self, batch_id, submitted=None):
+        """Track a batch, submitted is its time.time() submit time"""
+        self._submitted[batch_id] = time.time() if submitted is None else submitted
+        if batch_id not in self._results:
+            self._pending[batch_id] = None
+
+    @property
+    def pending(self):
+        """Ids of the batches not final yet, a live view"""
+        return self._pending.keys()
+
+    def wait(self, timeout, max_pending=0, auth_user=None, auth_password=None):
+        """Wait until every batch is final or timeout seconds have passed
+
+        Args:
+            timeout (float): seconds to wait at most
+            max_pending (int): return as soon as no more than this many
+                batches are pending
+
+        Returns:
+            dict: batch id keys, BatchResult values; batches still pending
+                at the deadline are reported as PENDING
+        """
+        self.drain(timeout, max_pending, auth_user=auth_user, auth_password=auth_password)
+
+        results = dict(self._results)
+        for batch_id in self._pending:
+            results[batch_id] = BatchResult(batch_id, 'PENDING')
+        return results
+
+    def drain(self, timeout, max_pending=0, auth_user=None, auth_password=None):
+        """wait without collecting the results, for backpressure
+
+        Returns:
+            int: number of batches still pending
+        """
+        deadline = time.time() + timeout
+        backoff = self._min_backoff
+
+        while len(self._pending) > max_pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+
+            #a long poll of a whole second would outlast the deadline
+            resolved = self._poll(
+                list(self._pending),
+                min(self._long_poll, int(remaining)),
+                auth_user=auth_user,
+                auth_password=auth_password)
+
+            if resolved:
+                backoff = self._min_backoff
+            elif self._pending:
+                time.sleep(min(backoff, max(0, deadline - time.time())))
+                backoff = min(backoff * 2, self._max_backoff)
+
+        return len(self._pending)
+
+    def poll(self, wait=1, auth_user=None, auth_password=None):
+        """
+        Ask once for the status of every pending batch.
+
+        Args:
+            wait (int): seconds the REST API may hold the request
+
+        Returns:
+            list: BatchResult of each batch that became final
+        """
+        if not self._pending:
+            return []
+        return self._poll(list(self._pending), wait, auth_user=auth_user, auth_password=auth_password)
+
+    def _poll(self, batch_ids, wait, auth_user=None, auth_password=None):
+        suffix, data, content_type = batch_status_request(batch_ids, wait)
+        result = self._client._send_request(
+            suffix, data, content_type,
+            auth_user=auth_user,
+            auth_password=auth_password)
+
+        try:
+            statuses = yaml.safe_load(result)['data']
+        except (yaml.YAMLError, KeyError, TypeError) as err:
+            raise codeSmellException("Invalid batch status response: {}".format(err))
+
+        now = time.time()
+        resolved = []
+        for entry in statuses:
+            batch_id = entry['id']
+            if entry['status'] in FINAL_STATUSES and batch_id in self._pending:
+                self._results[batch_id] = BatchResult(
+                    batch_id,
+                    entry['status'],
+                    latency=now - self._submitted[batch_id],
+                    invalid_transactions=entry.get('invalid_transactions'))
+                resolved.append(self._results[batch_id])
+                del self._pending[batch_id]
+                if entry['status'] == 'INVALID':
+                    #the client-side validator applied what did not commit
+                    self._client.reset_validation()
+
+        return resolved
@@ -1,90 +1,331 @@
+#!/usr/bin/env python3
+#
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+"""
+Load generator for the code-smell family.
+
+Batches of create, propose and vote transactions are signed by a pool of
+keys and submitted to the REST API at a target rate for a fixed duration,
+with up to --concurrency requests in flight. A poller thread follows every
+batch through batch_status, so the run reports submit to commit latency
+percentiles and the sustained committed txns/s, as JSON to compare runs.
+
+Proposals and votes only target code smells whose earlier transactions
+have committed (a vote closes a proposal at the default approval threshold
+of 1), so a healthy network commits every batch. Without enough eligible
+code smells a transaction falls back to a create.
+
+    python3 loadCodeSmell.py --url http://127.0.0.1:8008 --rate 200 \\
+        --duration 60 --mix create=60,propose=20,vote=20 --output run.json
+"""
+
+import os
 import sys
-import cbor
+import glob
 import json
-import sawtooth_sdk
-import urllib.request
+import time
+import queue
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import concurrent.futures
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), 'client'))
 
-from hashlib import sha512
-from urllib.error import HTTPError
-from sawtooth_signing import CryptoFactory
 from sawtooth_signing import create_context
-from sawtooth_sdk.protobuf.batch_pb2 import Batch
 from sawtooth_sdk.protobuf.batch_pb2 import BatchList
-from sawtooth_sdk.protobuf.batch_pb2 import BatchHeader
-from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
-from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
-
-#create a random private to test a transaction
-context = create_context('secp256k1')
-private_key = context.new_random_private_key()
-signer = CryptoFactory(context).new_signer(private_key)
-
-
-#encode payload
-#simple payload, name and owner
-payload = {
-    'action' : 'create',
-    'asset' : 'test',
-    'owner' : 'test1' }
-
-payload_bytes = cbor.dumps(payload)
-
-#create transaction headers
-txn_header_bytes = TransactionHeader(
-    family_name='code-smell',
-    family_version='0.1',
-    inputs=['19d832'],
-    outputs=['19d832'],
-    signer_public_key=signer.get_public_key().as_hex(),
-    # In this example, we're signing the batch with the same private key,
-    # but the batch can be signed by another party, in which case, the
-    # public key will need to be associated with that key.
-    batcher_public_key=signer.get_public_key().as_hex(),
-    # In this example, there are no dependencies.  This list should include
-    # an previous transaction header signatures that must be applied for
-    # this transaction to successfully commit.
-    # For example,
-    # dependencies=['540a6803971d1880ec73a96cb97815a95d374cbad5d865925e5aa0432fcf1931539afe10310c122c5eaae15df61236079abbf4f258889359c4d175516934484a'],
-    dependencies=[],
-    payload_sha512=sha512(payload_bytes).hexdigest()
-).SerializeToString()
-
-#create transaction
-signature = signer.sign(txn_header_bytes)
-
-txn = Transaction(
-    header=txn_header_bytes,
-    header_signature=signature,
-    payload=payload_bytes
-)
-
-#create batch headers
-txns = [txn]
-batch_header_bytes = BatchHeader(
-    signer_public_key=signer.get_public_key().as_hex(),
-    transaction_ids=[txn.header_signature for txn in txns],
-).SerializeToString()
-
-#create the batch
-signature = signer.sign(batch_header_bytes)
-batch = Batch(
-    header=batch_header_bytes,
-    header_signature=signature,
-    transactions=txns
-)
-
-#encode batch in a batchList
-batch_list_bytes = BatchList(batches=[batch]).SerializeToString()
-
-#send batch to validator
-try:
-    request = urllib.request.Request(
-        'http://127.0.0.1:8008/batches',
-        batch_list_bytes,
-        method='POST',
-        headers={'Content-Type': 'application/octet-stream'})
-    response = urllib.request.urlopen(request)
-    print(response)
-except HTTPError as e:
-    response = e.file
-    print(response)
+
+from code_smell_client import codeSmellClient
+from code_smell_client import _encode_payload
+from code_smell_client import CHAIN_NONE
+from code_smell_exceptions import codeSmellException
+from code_smell_waiter import codeSmellBatchWaiter
+
+ACTIONS = ('create', 'propose', 'vote')
+
+
+def _parse_mix(mix):
+    """'create=60,propose=20,vote=20' into normalized action weights"""
+    weights = {}
+    for part in mix.split(','):
+        action, _, weight = part.partition('=')
+        if action not in ACTIONS:
+            raise argparse.ArgumentTypeError("Unknown action: {}".format(action))
+        weights[action] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("Empty mix: {}".format(mix))
+    return {action: weight / total for action, weight in weights.items()}
+
+def _load_keys(key_dir, count):
+    """Key files in key_dir, generating the missing ones up to count"""
+    keyfiles = sorted(glob.glob(os.path.join(key_dir, 'loadgen-*.priv')))[:count]
+    context = create_context('secp256k1')
+    while len(keyfiles) < count:
+        keyfile = os.path.join(key_dir, 'loadgen-{}.priv'.format(len(keyfiles)))
+        with open(keyfile, 'w') as fd:
+            fd.write(context.new_random_private_key().as_hex())
+        keyfiles.append(keyfile)
+    return keyfiles
+
+def _percentile(values, percentile):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile / 100.0))]
+
+
+class _Model:
+    """What the chain holds, as far as committed batches tell"""
+
+    def __init__(self, prefix):
+        self._prefix = prefix
+        self._counter = 0
+        self.idle = []
+        self.open = []
+
+    def next_transaction(self, action):
+        """Pick a code smell for action, falling back to a create"""
+        if action == 'vote' and self.open:
+            name = self.open.pop(random.randrange(len(self.open)))
+            return 'vote', name, random.choice(('accept', 'reject'))
+        if action == 'propose' and self.idle:
+            name = self.idle.pop(random.randrange(len(self.idle)))
+            return 'propose', name, str(random.randint(1, 1000))
+        self._counter += 1
+        return 'create', '{}{}'.format(self._prefix, self._counter), str(random.randint(1, 1000))
+
+    def resolve(self, action, name, committed):
+        if action == 'propose':
+            (self.open if committed else self.idle).append(name)
+        elif action == 'vote':
+            (self.idle if committed else self.open).append(name)
+        elif committed:
+            self.idle.append(name)
+
+
+class _Poller(threading.Thread):
+    """Owns the waiter: adds submitted batches and reports final ones.
+
+    Statuses are polled without long polling, every interval seconds: a
+    long poll on every pending batch only returns once all of them are
+    final, which would round every latency up to the wait.
+    """
+
+    def __init__(self, client, interval):
+        super().__init__(daemon=True)
+        self._waiter = codeSmellBatchWaiter(client)
+        self._interval = interval
+        self.submitted = queue.Queue()
+        self.resolved = queue.Queue()
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            while True:
+                try:
+                    batch_id, submitted = self.submitted.get_nowait()
+                except queue.Empty:
+                    break
+                self._waiter.add(batch_id, submitted)
+
+            if self._waiter.pending:
+                try:
+                    for result in self._waiter.poll(wait=0):
+                        self.resolved.put((result, time.time()))
+                except codeSmellException:
+                    time.sleep(0.5)
+            self._stopped.wait(self._interval)
+
+
+def _submit(client, batch_list, poller):
+    submitted = time.time()
+    client.submit_batch_lists([batch_list])
+    poller.submitted.put((batch_list.batches[0].header_signature, submitted))
+
+def run(opts, keyfiles):
+    #the model only builds transactions its committed batches allow, so
+    #the processor is left to judge them
+    clients = [codeSmellClient(base_url=opts.url, keyfile=keyfile,
+                               chain_dependencies=CHAIN_NONE, validate=False)
+               for keyfile in keyfiles]
+    #the poller has a session of its own, apart from the submit threads
+    poller_client = codeSmellClient(base_url=opts.url, validate=False)
+    poller = _Poller(poller_client, opts.poll_interval)
+    poller.start()
+
+    model = _Model('Load{}-'.format(int(time.time())))
+    stats = {action: {'submitted': 0, 'committed': 0, 'invalid': 0} for action in ACTIONS}
+    batches = {}
+    latencies = []
+    failed_requests = 0
+    last_commit = None
+    actions, weights = zip(*opts.mix.items())
+
+    def _harvest(block=False, timeout=0):
+        nonlocal last_commit
+        while True:
+            try:
+                result, resolved_at = poller.resolved.get(block, timeout)
+            except queue.Empty:
+                return
+            block = False
+            committed = result.status == 'COMMITTED'
+            for action, name in batches.pop(result.batch_id):
+                model.resolve(action, name, committed)
+                stats[action]['committed' if committed else 'invalid'] += 1
+            if committed:
+                latencies.append(result.latency)
+                last_commit = resolved_at
+
+    def _reap():
+        nonlocal failed_requests
+        for future in [f for f in in_flight if f.done()]:
+            in_flight.discard(future)
+            if future.exception() is not None:
+                failed_requests += 1
+                for action, name in batches.pop(future.batch_id):
+                    model.resolve(action, name, False)
+                    stats[action]['submitted'] -= 1
+
+    interval = opts.txns_per_batch / float(opts.rate)
+    executor = concurrent.futures.ThreadPoolExecutor(opts.concurrency)
+    in_flight = set()
+    start = time.time()
+    next_send = start
+    end = start + opts.duration
+
+    try:
+        while time.time() < end:
+            _harvest()
+            _reap()
+
+            now = time.time()
+            if now < next_send or len(in_flight) >= opts.concurrency:
+                time.sleep(min(0.01, max(0, next_send - now)))
+                continue
+            next_send += interval
+
+            client = random.choice(clients)
+            transactions = []
+            content = []
+            for action in random.choices(actions, weights, k=opts.txns_per_batch):
+                action, name, value = model.next_transaction(action)
+                payload = _encode_payload(action, [(name, value)], client._family_version)
+                transactions.append(
+                    client._create_transaction(payload, client._get_addresses(name, action)))
+                content.append((action, name))
+                stats[action]['submitted'] += 1
+
+            batch_list = BatchList(batches=[client._create_batch(transactions)])
+            batches[batch_list.batches[0].header_signature] = content
+            future = executor.submit(_submit, client, batch_list, poller)
+            future.batch_id = batch_list.batches[0].header_signature
+            in_flight.add(future)
+
+        concurrent.futures.wait(in_flight)
+        _reap()
+        drain_end = time.time() + opts.drain
+        while batches and time.time() < drain_end:
+            _harvest(block=True, timeout=0.5)
+    finally:
+        poller.stop()
+        poller.join()
+        executor.shutdown()
+        poller_client.close()
+        for client in clients:
+            client.close()
+
+    committed = sum(s['committed'] for s in stats.values())
+    window = (last_commit - start) if last_commit else None
+    return {
+        'tool': 'loadCodeSmell',
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'config': {
+            'url': opts.url,
+            'rate': opts.rate,
+            'duration': opts.duration,
+            'concurrency': opts.concurrency,
+            'txns_per_batch': opts.txns_per_batch,
+            'keys': len(keyfiles),
+            'mix': opts.mix,
+            'poll_interval': opts.poll_interval,
+        },
+        'actions': stats,
+        'submitted_txns': sum(s['submitted'] for s in stats.values()),
+        'committed_txns': committed,
+        'invalid_txns': sum(s['invalid'] for s in stats.values()),
+        'pending_batches': len(batches),
+        'failed_requests': failed_requests,
+        'latency_s': {
+            'p50': _percentile(latencies, 50),
+            'p95': _percentile(latencies, 95),
+            'p99': _percentile(latencies, 99),
+            'max': max(latencies) if latencies else None,
+        },
+        'committed_txns_per_s': committed / window if window else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate create, propose and vote load against a REST API.')
+    parser.add_argument('--url', default='http://127.0.0.1:8008')
+    parser.add_argument('--rate', type=float, default=100,
+                        help='target transactions per second')
+    parser.add_argument('--duration', type=float, default=30,
+                        help='seconds to submit for')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='requests in flight at most')
+    parser.add_argument('--txns-per-batch', type=int, default=10)
+    parser.add_argument('--mix', type=_parse_mix, default='create=60,propose=20,vote=20',
+                        help='action weights, e.g. create=60,propose=20,vote=20')
+    parser.add_argument('--keys', type=int, default=4,
+                        help='signer keys batches are spread over')
+    parser.add_argument('--key-dir',
+                        help='reuse (and add to) loadgen-N.priv keys in this directory')
+    parser.add_argument('--drain', type=float, default=30,
+                        help='seconds to wait for pending batches after the run')
+    parser.add_argument('--poll-interval', type=float, default=0.1,
+                        help='seconds between batch status polls, the latency resolution')
+    parser.add_argument('--seed', type=int, help='random seed')
+    parser.add_argument('--output', help='write the JSON report here too')
+    opts = parser.parse_args()
+
+    if opts.seed is not None:
+        random.seed(opts.seed)
+
+    if opts.key_dir:
+        os.makedirs(opts.key_dir, exist_ok=True)
+        report = run(opts, _load_keys(opts.key_dir, opts.keys))
+    else:
+        with tempfile.TemporaryDirectory() as key_dir:
+            report = run(opts, _load_keys(key_dir, opts.keys))
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if opts.output:
+        with open(opts.output, 'w') as fd:
+            fd.write(text + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+import os
+import time
+import logging
+import threading
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+LOGGER = logging.getLogger(__name__)
+
+#seconds, from a local dict lookup to a slow validator round trip
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ['{}="{}"'.format(n, str(v).replace('"', '\\"')) for n, v in zip(names, values)]
+    return '{' + ','.join(pairs) + '}'
+
+class Counter:
+    """Monotonic counter, optionally split by label values"""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self._labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self.name, self.documentation),
+                 '# TYPE {} counter'.format(self.name)]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append('{}{} {}'.format(
+                self.name, _format_labels(self._labels, label_values), value))
+        return lines
+
+class Histogram:
+    """Cumulative bucket histogram, as exposed by Prometheus"""
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self._buckets = tuple(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self._buckets)
+        for i, bound in enumerate(self._buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @property
+    def count(self):
+        return sum(self._counts)
+
+    def time(self):
+        return _Timer(self)
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self.name, self.documentation),
+                 '# TYPE {} histogram'.format(self.name)]
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = 0
+        for bound, count in zip(self._buckets + ('+Inf',), counts):
+            cumulative += count
+            lines.append('{}_bucket{{le="{}"}} {}'.format(self.name, bound, cumulative))
+        lines.append('{}_sum {}'.format(self.name, total))
+        lines.append('{}_count {}'.format(self.name, cumulative))
+        return lines
+
+class _Timer:
+    def __init__(self, histogram):
+        self._histogram = histogram
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+class Gauge:
+    """Value read from a callback every time the metrics are rendered"""
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self._callback = callback
+
+    def render(self):
+        return ['# HELP {} {}'.format(self.name, self.documentation),
+                '# TYPE {} gauge'.format(self.name),
+                '{} {}'.format(self.name, self._callback())]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, buckets))
+
+    def gauge(self, name, documentation, callback):
+        return self._register(Gauge(name, documentation, callback))
+
+    def render(self):
+        """Prometheus text exposition of every registered metric"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+METRICS = MetricsRegistry()
+
+APPLY_LATENCY = METRICS.histogram(
+    'codesmell_apply_seconds', 'Time spent in codeSmellTransactionHandler.apply')
+APPLY_TOTAL = METRICS.counter(
+    'codesmell_apply_total', 'Transactions applied, by action', labels=('action',))
+REJECTED_TOTAL = METRICS.counter(
+    'codesmell_rejected_total', 'Transactions rejected, by reason', labels=('reason',))
+PAYLOAD_BYTES = METRICS.histogram(
+    'codesmell_payload_bytes', 'Size of transaction payloads', buckets=SIZE_BUCKETS)
+GET_STATE_LATENCY = METRICS.histogram(
+    'codesmell_get_state_seconds', 'Time spent in context.get_state')
+SET_STATE_LATENCY = METRICS.histogram(
+    'codesmell_set_state_seconds', 'Time spent in context.set_state')
+DELETE_STATE_LATENCY = METRICS.histogram(
+    'codesmell_delete_state_seconds', 'Time spent in context.delete_state')
+ADD_EVENT_LATENCY = METRICS.histogram(
+    'codesmell_add_event_seconds', 'Time spent in context.add_event')
+
+def rejection_reason(err):
+    """Bounded label for an error, messages put variable parts after ':'"""
+    return str(err).split(':')[0].strip() or type(err).__name__
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry = METRICS
+
+    def do_GET(self):
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        LOGGER.debug(format, *args)
+
+def start_http_exporter(port, host='127.0.0.1'):
+    """Serve the metrics as Prometheus text on host:port from a daemon thread
+
+    Returns:
+        ThreadingHTTPServer: the running server, shutdown() stops it
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, name='codeSmell-metrics', daemon=True)
+    thread.start()
+    LOGGER.info("Serving metrics on http://%s:%s/metrics", host, port)
+    return server
+
+def start_file_exporter(filename, interval=10):
+    """Rewrite filename with the metrics every interval seconds from a daemon thread
+
+    Returns:
+        threading.Event: set it to stop the dumps
+    """
+    stopped = threading.Event()
+
+    def dump():
+        while not stopped.wait(interval):
+            temp = filename + '.tmp'
+            with open(temp, 'w') as fd:
+                fd.write(METRICS.render())
+            os.replace(temp, filename)
+
+    threading.Thread(target=dump, name='codeSmell-metrics', daemon=True).start()
+    LOGGER.info("Writing metrics to %s every %s seconds", filename, interval)
+    return stopped
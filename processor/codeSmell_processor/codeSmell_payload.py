@@ -13,35 +13,52 @@
 # limitations under the License.
 # -----------------------------------------------------------------------------
 
+import cbor
+import logging
+
 from sawtooth_sdk.processor.exceptions import InvalidTransaction
 
 
+FAMILY_VERSION_CSV = '0.1'
+FAMILY_VERSION_CBOR = '0.2'
+
+LOGGER = logging.getLogger(__name__)
+
+ACTIONS = ('create', 'propose', 'vote', 'batch')
+
+STATE_DELIMITERS = (',', '|')
+
+
 class codeSmellPayload(object):
 
-    def __init__(self, payload):
-        try:
-            #The payload is csv utf-8 encoded string
-            name, value, action = payload.decode().split(",")
-            print ( name, value, action)
-        except ValueError:
-            raise InvalidTransaction("Invalid payload serialization")
+    def __init__(self, payload, family_version=FAMILY_VERSION_CSV):
+        if family_version == FAMILY_VERSION_CSV:
+            action, entries = _parse_csv(payload)
+        elif family_version == FAMILY_VERSION_CBOR:
+            action, entries = _parse_cbor(payload)
+        else:
+            raise InvalidTransaction(
+                'Unsupported family version: {}'.format(family_version))
 
-        if not name:
-            raise InvalidTransaction ('Name is required')
-        if not value:
-            raise InvalidTransaction ('Value is required')
         if not action:
             raise InvalidTransaction('Action is required')
-        if action not in ('create', 'propose', 'vote'):
+        if action not in ACTIONS:
             raise InvalidTransaction('Invalid action: {}'.format(action))
 
-        self._name = name
-        self._value = value
+        if action == 'batch':
+            _validate_batch(entries)
+        elif len(entries) != 1:
+            raise InvalidTransaction("Invalid payload serialization")
+        else:
+            _validate_entry(*entries[0])
+
+        self._name, self._value = entries[0]
         self._action = action
+        self._entries = entries
 
     @staticmethod
-    def from_bytes(payload):
-        return codeSmellPayload(payload=payload)
+    def from_bytes(payload, family_version=FAMILY_VERSION_CSV):
+        return codeSmellPayload(payload=payload, family_version=family_version)
 
     @property
     def name(self):
@@ -54,3 +71,108 @@ class codeSmellPayload(object):
     @property
     def action(self):
         return self._action
+
+    @property
+    def entries(self):
+        """list of (name, value) tuples carried by the payload"""
+        return self._entries
+
+def _parse_csv(payload):
+    """
+    Parse a family version 0.1 payload.
+
+    The payload is a csv utf-8 encoded string, a batch payload is a list of
+    csv records separated by '|'. Names and values can not hold ',' or '|'.
+
+    Returns:
+        tuple: action (str), list of (name, value) tuples
+    """
+    try:
+        records = [record.split(",") for record in payload.decode().split("|")]
+        name, value, action = records[0]
+        LOGGER.debug("Payload %s,%s,%s", name, value, action)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidTransaction("Invalid payload serialization")
+
+    entries = []
+    for record in records:
+        if len(record) != 3:
+            raise InvalidTransaction("Invalid payload serialization")
+        if record[2] != action:
+            raise InvalidTransaction('Invalid action in batch: {}'.format(record[2]))
+        entries.append((record[0], record[1]))
+
+    return action, entries
+
+def _parse_cbor(payload):
+    """
+    Parse a family version 0.2 payload.
+
+    The payload is a cbor map, either
+        {'action': <str>, 'name': <str>, 'value': <str>}
+    or, for the batch action,
+        {'action': 'batch', 'entries': [[<name>, <value>], ...]}
+
+    Strings are length prefixed, but the state records they are stored in
+    are still csv and '|' delimited, so names and values can not hold ','
+    or '|' either, as in version 0.1.
+
+    Returns:
+        tuple: action (str), list of (name, value) tuples
+    """
+    try:
+        content = cbor.loads(payload)
+    except Exception:  # pylint: disable=broad-except
+        raise InvalidTransaction("Invalid payload serialization")
+
+    if not isinstance(content, dict):
+        raise InvalidTransaction("Invalid payload serialization")
+
+    action = content.get('action')
+    if action == 'batch':
+        records = content.get('entries')
+        if not isinstance(records, list) or not records:
+            raise InvalidTransaction("Invalid payload serialization")
+    else:
+        records = [[content.get('name'), content.get('value')]]
+
+    entries = []
+    for record in records:
+        if not isinstance(record, list) or len(record) != 2:
+            raise InvalidTransaction("Invalid payload serialization")
+        name, value = record
+        if not isinstance(name, str) or not isinstance(value, str):
+            raise InvalidTransaction("Invalid payload serialization")
+        entries.append((name, value))
+
+    if not isinstance(action, str):
+        raise InvalidTransaction("Invalid payload serialization")
+
+    return action, entries
+
+def _validate_entry(name, value):
+    if not name:
+        raise InvalidTransaction ('Name is required')
+    if not value:
+        raise InvalidTransaction ('Value is required')
+    #state records are csv and '|' delimited, see codeSmellState._serialize
+    if any(c in name or c in value for c in STATE_DELIMITERS):
+        raise InvalidTransaction(
+            "Invalid character in name or value: {}".format(" or ".join(STATE_DELIMITERS)))
+
+def _validate_batch(entries):
+    """
+    Validate every entry of a batch payload.
+
+    Args:
+        entries (list): (name, value) tuples
+
+    Raises:
+        InvalidTransaction: empty field or duplicated names
+    """
+    names = set()
+    for name, value in entries:
+        _validate_entry(name, value)
+        if name in names:
+            raise InvalidTransaction('Duplicated name in batch: {}'.format(name))
+        names.add(name)
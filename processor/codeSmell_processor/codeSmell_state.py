@@ -14,15 +14,34 @@
 # -----------------------------------------------------------------------------
 
 import hashlib
+import logging
 
 from sawtooth_sdk.processor.exceptions import InternalError
 
+from codeSmell_processor.codeSmell_metrics import GET_STATE_LATENCY
+from codeSmell_processor.codeSmell_metrics import SET_STATE_LATENCY
+from codeSmell_processor.codeSmell_metrics import DELETE_STATE_LATENCY
+from codeSmell_processor.codeSmell_metrics import ADD_EVENT_LATENCY
+
+LOGGER = logging.getLogger(__name__)
+
 
 CODESMELL_NAMESPACE = hashlib.sha512('code-smell'.encode('utf-8')).hexdigest()[0:6]
 
 def _make_codeSmell_address(name):
     return CODESMELL_NAMESPACE + hashlib.sha512(name.encode('utf-8')).hexdigest()[:64]
 
+def _make_address(key):
+    """Address of a state key
+
+    Keys are tuples, ('smell', name) for code smells and ('proposal', name),
+    ('tally', name) or ('vote', name, voter) for proposals. Names
+    can not hold ',' so the joined key never collides with a code smell name.
+    """
+    if key[0] == 'smell':
+        return _make_codeSmell_address(key[1])
+    return _make_codeSmell_address(",".join(str(part) for part in key))
+
 class codeSmell:
     def __init__(self, name, value, action):
         self.name = name
@@ -43,6 +62,17 @@ class codeSmellState:
         self._context = context
         self._address_cache = {}
 
+    def get_codeSmell(self, codeSmell_name):
+        """Get the codeSmell stored under codeSmell_name
+
+        Args:
+            codeSmell_name (str): The name
+
+        Returns:
+            (codeSmell): the stored codeSmell, None if it does not exists
+        """
+        return self._load_codeSmell(codeSmell_name=codeSmell_name).get(codeSmell_name)
+
     def set_codeSmell(self, codeSmell_name, codesmell):
         """Store the codeSmell in the validator state
 
@@ -54,37 +84,121 @@ class codeSmellState:
         dictCodeSmells = {}
         dictCodeSmells[codeSmell_name] = codesmell
 
-        print ("before calling store")
         self._store_codeSmell(codeSmell_name, dictCodeSmells=dictCodeSmells)
 
+    def set_codeSmells(self, codesmells):
+        """Store many codeSmells in the validator state with a single set_state
+
+        Args:
+            codesmells (dict): codesmell name (str) keys, codeSmell values.
+        """
+        state_entries = {}
+        for codeSmell_name, codesmell in codesmells.items():
+            address = _make_codeSmell_address(codeSmell_name)
+            dictCodeSmells = state_entries.setdefault(address, {})
+            dictCodeSmells[codeSmell_name] = codesmell
+
+        self._store_codeSmells(state_entries)
+
+    def get_entries(self, keys):
+        """Get the codeSmells stored under several state keys in one round trip
+
+        Args:
+            keys (list): state keys, see _make_address
+
+        Returns:
+            (list): codeSmell or None for every key, in order
+        """
+        addresses = [_make_address(key) for key in keys]
+        self._fetch([a for a in addresses if a not in self._address_cache])
+
+        return [
+            self._decode(self._address_cache[address]).get(key[1])
+            for key, address in zip(keys, addresses)
+        ]
+
+    def set_entries(self, entries):
+        """Store codeSmells under several state keys with a single set_state
+
+        Args:
+            entries (dict): state keys, codeSmell values.
+        """
+        self._store_codeSmells({
+            _make_address(key): {key[1]: codesmell}
+            for key, codesmell in entries.items()
+        })
+
+    def delete_entries(self, keys):
+        """Remove several state keys with a single delete_state
+
+        Args:
+            keys (list): state keys, see _make_address
+        """
+        addresses = [_make_address(key) for key in keys]
+        for address in addresses:
+            self._address_cache[address] = None
+
+        with DELETE_STATE_LATENCY.time():
+            self._context.delete_state(addresses, timeout=self.TIMEOUT)
+
+    def add_event(self, event_type, attributes):
+        """Emit an event, sent to subscribers once the block commits
+
+        Args:
+            event_type (str): event type subscribers filter on
+            attributes (list): (key, value) tuples, keys may repeat
+        """
+        with ADD_EVENT_LATENCY.time():
+            self._context.add_event(event_type, attributes=attributes, timeout=self.TIMEOUT)
+
+    def _fetch(self, addresses):
+        if not addresses:
+            return
+
+        with GET_STATE_LATENCY.time():
+            state_entries = self._context.get_state(addresses, timeout=self.TIMEOUT)
+        for address in addresses:
+            self._address_cache[address] = None
+        for entry in state_entries:
+            self._address_cache[entry.address] = entry.data
+
     def _load_codeSmell(self, codeSmell_name):
         address = _make_codeSmell_address(codeSmell_name)
 
-        if address in self._address_cache:
-            if self._address_cache[address]:
-                serialized_codeSmell = self._address_cache[address]
-                dictCodeSmells = self._deserialize(serialized_codeSmell)
-            else:
-                dictCodeSmells = {}
-        else:
-            state_entries = self._context.get_state([address], timeout=self.TIMEOUT)
-            if state_entries:
-                self._address_cache[address] = state_entries[0].data
-                dictCodeSmells = self._deserialize(data=state_entries[0].data)
-            else:
-                self._address_cache[address] = None
-                dictCodeSmells = {}
+        if address not in self._address_cache:
+            self._fetch([address])
 
-        return dictCodeSmells
+        return self._decode(self._address_cache[address])
+
+    def _decode(self, data):
+        if not data:
+            return {}
+
+        return self._deserialize(data=data)
 
     def _store_codeSmell(self, codeSmell_name, dictCodeSmells):
-        print ("inse store")
         address = _make_codeSmell_address(codeSmell_name)
 
         state_data = self._serialize(dictCodeSmells)
         self._address_cache[address] = state_data
 
-        self._context.set_state({address: state_data}, timeout=self.TIMEOUT)
+        with SET_STATE_LATENCY.time():
+            self._context.set_state({address: state_data}, timeout=self.TIMEOUT)
+
+    def _store_codeSmells(self, state_entries):
+        """Serialize and write several addresses in one round trip
+
+        Args:
+            state_entries (dict): address (str) keys, dict of codeSmells values.
+        """
+        LOGGER.debug("Storing %s addresses", len(state_entries))
+        state_data = {}
+        for address, dictCodeSmells in state_entries.items():
+            state_data[address] = self._serialize(dictCodeSmells)
+            self._address_cache[address] = state_data[address]
+
+        with SET_STATE_LATENCY.time():
+            self._context.set_state(state_data, timeout=self.TIMEOUT)
 
     def _deserialize(self, data):
         """Take bytes stored in state and deserialize them into Python codeSmell Objects
@@ -97,10 +211,10 @@ class codeSmellState:
         """
         dictCodeSmells = {}
         try:
-            for codesmell in data.encode().split("|"):
-                name, value, action, owner = payload.decode().split(",")
+            for codesmell in data.decode().split("|"):
+                name, value, action = codesmell.split(",")
 
-                dictCodeSmells[name] = codeSmell(name, value, action, owner)
+                dictCodeSmells[name] = codeSmell(name, value, action)
 
         except ValueError:
             raise InternalError("Failed to deserialize codesmell data")
@@ -0,0 +1,121 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+import time
+import signal
+import logging
+import multiprocessing
+import multiprocessing.connection
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt()
+
+def _run_worker(target, args, index):
+    """Entry point of a worker process, SIGTERM stops it like Ctrl-C"""
+    signal.signal(signal.SIGTERM, _interrupt)
+    target(*args, worker=index)
+
+class codeSmellWorkerPool:
+    """Run and supervise N transaction processor processes.
+
+    Every worker opens its own connection and registers with the validator,
+    which then spreads transactions between them. A worker that exits while
+    the pool is running is restarted, waiting longer each time it dies right
+    after starting so a bad endpoint does not turn into a fork loop.
+    """
+    POLL_INTERVAL = 1
+    STOP_TIMEOUT = 5
+    MIN_RESTART_DELAY = 1
+    MAX_RESTART_DELAY = 30
+
+    def __init__(self, target, args, workers):
+        """Constructor
+
+        Args:
+            target (callable): runs one transaction processor until stopped,
+                called with the worker index as the worker keyword argument
+            args (tuple): arguments passed to target
+            workers (int): number of processes to keep running
+        """
+        self._target = target
+        self._args = args
+        self._workers = [None] * workers
+        self._started = [0.0] * workers
+        self._delays = [self.MIN_RESTART_DELAY] * workers
+        self._stopping = False
+
+    def run(self):
+        """Start the workers and supervise them until SIGTERM or Ctrl-C"""
+        previous = signal.signal(signal.SIGTERM, _interrupt)
+        try:
+            for index in range(len(self._workers)):
+                self._start_worker(index)
+
+            while not self._stopping:
+                sentinels = [w.sentinel for w in self._workers if w is not None]
+                multiprocessing.connection.wait(sentinels, timeout=self.POLL_INTERVAL)
+                self._restart_dead_workers()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            signal.signal(signal.SIGTERM, previous)
+
+    def stop(self):
+        """Terminate every worker, killing the ones that do not exit in time"""
+        self._stopping = True
+        alive = [w for w in self._workers if w is not None and w.is_alive()]
+        for worker in alive:
+            worker.terminate()
+
+        deadline = time.time() + self.STOP_TIMEOUT
+        for worker in alive:
+            worker.join(max(0, deadline - time.time()))
+            if worker.is_alive():
+                LOGGER.warning("Worker %s did not stop, killing it", worker.pid)
+                worker.kill()
+                worker.join()
+
+    def _start_worker(self, index):
+        worker = multiprocessing.Process(
+            target=_run_worker,
+            args=(self._target, self._args, index),
+            name="codeSmell-worker-{}".format(index))
+        worker.start()
+        self._workers[index] = worker
+        self._started[index] = time.time()
+        LOGGER.info("Started worker %s (pid %s)", index, worker.pid)
+
+    def _restart_dead_workers(self):
+        for index, worker in enumerate(self._workers):
+            if worker.is_alive() or self._stopping:
+                continue
+
+            worker.join()
+            LOGGER.warning("Worker %s (pid %s) exited with code %s",
+                           index, worker.pid, worker.exitcode)
+
+            #back off when the worker keeps dying right after starting
+            if time.time() - self._started[index] < self.MAX_RESTART_DELAY:
+                time.sleep(self._delays[index])
+                self._delays[index] = min(self._delays[index] * 2, self.MAX_RESTART_DELAY)
+            else:
+                self._delays[index] = self.MIN_RESTART_DELAY
+
+            if not self._stopping:
+                self._start_worker(index)
@@ -0,0 +1,161 @@
+# Copyright 2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# -----------------------------------------------------------------------------
+
+import os
+import logging
+
+import toml
+
+from sawtooth_sdk.processor.exceptions import LocalConfigurationError
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def load_default_codeSmell_config():
+    """
+    Returns the default codeSmellConfig
+    """
+    return codeSmellConfig(
+        connect='tcp://localhost:4004',
+        workers=1)
+
+
+def load_toml_codeSmell_config(filename):
+    """Returns a codeSmellConfig created by loading a TOML file from the
+    filesystem.
+
+    Args:
+        filename (string): The name of the file to load the config from
+
+    Returns:
+        config (codeSmellConfig): The codeSmellConfig created from the stored
+            toml file.
+
+    Raises:
+        LocalConfigurationError
+    """
+    if not os.path.exists(filename):
+        LOGGER.info(
+            "Skipping transaction processor config loading from non-existent"
+            " config file: %s", filename)
+        return codeSmellConfig()
+
+    LOGGER.info("Loading transaction processor information from config: %s",
+                filename)
+
+    try:
+        with open(filename) as fd:
+            raw_config = fd.read()
+    except IOError as e:
+        raise LocalConfigurationError(
+            "Unable to load transaction processor configuration file:"
+            " {}".format(str(e)))
+
+    toml_config = toml.loads(raw_config)
+    invalid_keys = set(toml_config.keys()).difference(
+        ['connect', 'workers', 'metrics_port', 'metrics_file'])
+    if invalid_keys:
+        raise LocalConfigurationError(
+            "Invalid keys in transaction processor config: "
+            "{}".format(", ".join(sorted(list(invalid_keys)))))
+
+    config = codeSmellConfig(
+        connect=toml_config.get("connect", None),
+        workers=toml_config.get("workers", None),
+        metrics_port=toml_config.get("metrics_port", None),
+        metrics_file=toml_config.get("metrics_file", None))
+
+    return config
+
+
+def merge_codeSmell_config(configs):
+    """
+    Given a list of codeSmellConfig objects, merges them into a single
+    codeSmellConfig, giving priority in the order of the configs
+    (first has highest priority).
+
+    Args:
+        config (list of codeSmellConfigs): The list of codeSmell configs that
+            must be merged together
+
+    Returns:
+        config (codeSmellConfig): One codeSmellConfig that combines all of the
+            passed in configs.
+    """
+    connect = None
+    workers = None
+    metrics_port = None
+    metrics_file = None
+
+    for config in reversed(configs):
+        if config.connect is not None:
+            connect = config.connect
+        if config.workers is not None:
+            workers = config.workers
+        if config.metrics_port is not None:
+            metrics_port = config.metrics_port
+        if config.metrics_file is not None:
+            metrics_file = config.metrics_file
+
+    return codeSmellConfig(
+        connect=connect,
+        workers=workers,
+        metrics_port=metrics_port,
+        metrics_file=metrics_file)
+
+
+class codeSmellConfig:
+    def __init__(self, connect=None, workers=None, metrics_port=None, metrics_file=None):
+        self._connect = connect
+        self._workers = workers
+        self._metrics_port = metrics_port
+        self._metrics_file = metrics_file
+
+    @property
+    def connect(self):
+        return self._connect
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def metrics_port(self):
+        return self._metrics_port
+
+    @property
+    def metrics_file(self):
+        return self._metrics_file
+
+    def __repr__(self):
+        return \
+            "{}(connect={}, workers={}, metrics_port={}, metrics_file={})".format(
+                self.__class__.__name__,
+                repr(self._connect),
+                repr(self._workers),
+                repr(self._metrics_port),
+                repr(self._metrics_file))
+
+    def to_dict(self):
+        return {
+            'connect': self._connect,
+            'workers': self._workers,
+            'metrics_port': self._metrics_port,
+            'metrics_file': self._metrics_file
+        }
+
+    def to_toml_string(self):
+        return str(toml.dumps(self.to_dict())).strip().split('\n')
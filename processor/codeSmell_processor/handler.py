@@ -23,9 +23,24 @@ from codeSmell_processor.codeSmell_state import codeSmell
 from codeSmell_processor.codeSmell_state import codeSmellState
 from codeSmell_processor.codeSmell_state import CODESMELL_NAMESPACE
 from codeSmell_processor.codeSmell_payload import codeSmellPayload
+from codeSmell_processor.codeSmell_payload import FAMILY_VERSION_CSV
+from codeSmell_processor.codeSmell_payload import FAMILY_VERSION_CBOR
+from codeSmell_processor.codeSmell_metrics import APPLY_TOTAL
+from codeSmell_processor.codeSmell_metrics import APPLY_LATENCY
+from codeSmell_processor.codeSmell_metrics import PAYLOAD_BYTES
+from codeSmell_processor.codeSmell_metrics import REJECTED_TOTAL
+from codeSmell_processor.codeSmell_metrics import rejection_reason
 
 LOGGER = logging.getLogger(__name__)
 
+#code smell holding the number of accept (or reject) votes closing a proposal
+APPROVAL_THRESHOLD_NAME = 'ApprovalThreshold'
+DEFAULT_APPROVAL_THRESHOLD = 1
+
+#emitted with a name and a value attribute for each code smell whose value
+#a transaction set, in order
+EVENT_UPDATED = 'code-smell/updated'
+
 class codeSmellTransactionHandler(TransactionHandler):
 
     @property
@@ -34,36 +49,180 @@ class codeSmellTransactionHandler(TransactionHandler):
 
     @property
     def family_versions(self):
-        return ['0.1']
+        return [FAMILY_VERSION_CSV, FAMILY_VERSION_CBOR]
 
     @property
     def namespaces(self):
         return [CODESMELL_NAMESPACE]
 
     def apply(self, transaction, context):
+        PAYLOAD_BYTES.observe(len(transaction.payload))
+        with APPLY_LATENCY.time():
+            try:
+                action = self._apply(transaction, context)
+            except (InvalidTransaction, InternalError) as err:
+                REJECTED_TOTAL.inc(rejection_reason(err))
+                raise
+        APPLY_TOTAL.inc(action)
+
+    def _apply(self, transaction, context):
         header = transaction.header
         signer = header.signer_public_key
 
-        codeSmell_payload = codeSmellPayload.from_bytes(transaction.payload)
+        codeSmell_payload = codeSmellPayload.from_bytes(
+            transaction.payload, family_version=header.family_version)
         codeSmell_state = codeSmellState(context)
-        print ("ad context")
-        print (codeSmell_state)
+        LOGGER.debug("Applying %s from %s", codeSmell_payload.action, signer[:6])
 
         if codeSmell_payload.action == 'create':
-            print ("sending information to state")
             code_smell = codeSmell (
                          name=codeSmell_payload.name,
                          value=codeSmell_payload.value,
                          action=codeSmell_payload.action)
-            print ("set code Smell")
             codeSmell_state.set_codeSmell(codeSmell_payload.name, code_smell)
+            _updated(codeSmell_state, [(codeSmell_payload.name, codeSmell_payload.value)])
             _display("Peer {} created a codeSmell config.".format(signer[:6]))
 
+        elif codeSmell_payload.action == 'batch':
+            code_smells = {
+                name: codeSmell(name=name, value=value, action='create')
+                for name, value in codeSmell_payload.entries
+            }
+            codeSmell_state.set_codeSmells(code_smells)
+            _updated(codeSmell_state, codeSmell_payload.entries)
+            _display("Peer {} created {} codeSmell configs.".format(
+                signer[:6], len(code_smells)))
+
+        elif codeSmell_payload.action == 'propose':
+            _propose(codeSmell_payload, signer, codeSmell_state)
+
+        elif codeSmell_payload.action == 'vote':
+            _vote(codeSmell_payload, signer, codeSmell_state)
+
         else:
             raise InvalidTransaction('Unhandled action: {}'.format(
-                payload.action))
+                codeSmell_payload.action))
+
+        return codeSmell_payload.action
+
+def _propose(payload, signer, state):
+    """
+    Open a proposal to change the value of an existing code smell.
+
+    Opening a proposal starts a new tally generation, so votes cast on
+    earlier proposals for the same code smell are not counted again.
+    """
+    name = payload.name
+    code_smell, proposal, tally = state.get_entries([
+        ('smell', name), ('proposal', name), ('tally', name)])
+
+    if code_smell is None:
+        raise InvalidTransaction('No such code smell: {}'.format(name))
+    if proposal is not None:
+        raise InvalidTransaction('Proposal already open: {}'.format(name))
+
+    generation = _parse_tally(tally)[0] + 1 if tally is not None else 1
+
+    state.set_entries({
+        ('proposal', name): codeSmell(name=name, value=payload.value, action='propose'),
+        ('tally', name): codeSmell(name=name, value=_format_tally(generation, 0, 0), action='tally'),
+    })
+    _display("Peer {} proposed {} for {}.".format(signer[:6], payload.value, name))
+
+def _vote(payload, signer, state):
+    """
+    Count one vote on the open proposal of a code smell.
+
+    Every vote reads the proposal, its tally counter and the voter marker and
+    writes the counter and the marker, so the cost does not depend on how
+    many peers already voted. The marker is kept per code smell and voter,
+    and holds the generation voted on, so every address a vote touches is
+    known before it is sent.
+    """
+    name = payload.name
+    if payload.value not in ('accept', 'reject'):
+        raise InvalidTransaction('Invalid vote: {}'.format(payload.value))
+
+    vote_key = ('vote', name, signer)
+    proposal, tally, threshold, marker = state.get_entries([
+        ('proposal', name), ('tally', name), ('smell', APPROVAL_THRESHOLD_NAME), vote_key])
+
+    if proposal is None or tally is None:
+        raise InvalidTransaction('No open proposal: {}'.format(name))
+
+    generation, accepts, rejects = _parse_tally(tally)
+    if marker is not None and _parse_marker(marker) == generation:
+        raise InvalidTransaction(
+            'Peer already voted: {} on {}'.format(signer[:6], name))
+
+    if payload.value == 'accept':
+        accepts += 1
+    else:
+        rejects += 1
+
+    entries = {
+        ('tally', name): codeSmell(
+            name=name, value=_format_tally(generation, accepts, rejects), action='tally'),
+        vote_key: codeSmell(
+            name=name, value=_format_marker(generation, payload.value), action='vote'),
+    }
+
+    approval_threshold = _approval_threshold(threshold)
+    if accepts >= approval_threshold:
+        entries[('smell', name)] = codeSmell(name=name, value=proposal.value, action='create')
+
+    state.set_entries(entries)
+    if accepts >= approval_threshold:
+        _updated(state, [(name, proposal.value)])
+
+    if accepts >= approval_threshold or rejects >= approval_threshold:
+        state.delete_entries([('proposal', name)])
+        _display("Proposal {} for {} {}.".format(
+            proposal.value, name,
+            'accepted' if accepts >= approval_threshold else 'rejected'))
+
+def _updated(state, code_smells):
+    """Emit one EVENT_UPDATED event for (name, value) tuples"""
+    attributes = []
+    for name, value in code_smells:
+        attributes.append(('name', name))
+        attributes.append(('value', value))
+    state.add_event(EVENT_UPDATED, attributes)
+
+def _format_tally(generation, accepts, rejects):
+    return ":".join([str(generation), str(accepts), str(rejects)])
+
+def _parse_tally(tally):
+    try:
+        generation, accepts, rejects = (int(v) for v in tally.value.split(":"))
+    except ValueError:
+        raise InternalError('Failed to deserialize tally: {}'.format(tally.name))
+
+    return generation, accepts, rejects
+
+def _format_marker(generation, vote):
+    return ":".join([str(generation), vote])
+
+def _parse_marker(marker):
+    """Generation a voter marker was written for"""
+    try:
+        return int(marker.value.split(":")[0])
+    except ValueError:
+        raise InternalError('Failed to deserialize vote marker: {}'.format(marker.name))
+
+def _approval_threshold(threshold):
+    if threshold is None:
+        return DEFAULT_APPROVAL_THRESHOLD
+    try:
+        return max(1, int(float(threshold.value)))
+    except ValueError:
+        raise InvalidTransaction(
+            'Invalid approval threshold: {}'.format(threshold.value))
 
 def _display(msg):
+    if not LOGGER.isEnabledFor(logging.DEBUG):
+        return
+
     n = msg.count("\n")
 
     if n > 0:
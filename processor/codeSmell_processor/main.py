@@ -14,6 +14,7 @@
 # -----------------------------------------------------------------------------
 import os
 import sys
+import logging
 import argparse
 import pkg_resources
 
@@ -21,6 +22,9 @@ from sawtooth_sdk.processor.log  import log_configuration
 from sawtooth_sdk.processor.log  import init_console_logging
 from sawtooth_sdk.processor.core import TransactionProcessor
 from codeSmell_processor.handler import codeSmellTransactionHandler
+from codeSmell_processor.codeSmell_workers import codeSmellWorkerPool
+from codeSmell_processor.codeSmell_metrics import start_file_exporter
+from codeSmell_processor.codeSmell_metrics import start_http_exporter
 
 from sawtooth_sdk.processor.config import get_log_dir
 from sawtooth_sdk.processor.config import get_log_config
@@ -32,15 +36,33 @@ from codeSmell_processor.config.codeSmell import load_default_codeSmell_config
 
 DISTRIBUTION_NAME = 'sawtooth-codeSmell'
 
+LOGGER = logging.getLogger(__name__)
+
 def parse_args(args):
     parser = argparse.ArgumentParser(
         formatter_class=argparse.RawTextHelpFormatter)
 
     parser.add_argument(
         '-C', '--connect',
-        default='tcp://localhost:4004',
         help='Endpoint for the validator connection')
 
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        help='Number of transaction processor processes to run, each one\n'
+        'registers with the validator (default 1)')
+
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help='Serve Prometheus metrics on this localhost port, with\n'
+        '--workers N each worker uses the next port')
+
+    parser.add_argument(
+        '--metrics-file',
+        help='Rewrite this file with Prometheus metrics every 10 seconds,\n'
+        'with --workers N each worker appends its index')
+
     parser.add_argument(
         '-v', '--verbose',
         action='count',
@@ -64,23 +86,56 @@ def load_codeSmell_config(first_config):
     default_codeSmell_config = load_default_codeSmell_config()
     config_file = os.path.join(get_config_dir(), 'codeSmell.toml')
 
-    toml_config = load_toml_codeSmell_config()
+    toml_config = load_toml_codeSmell_config(config_file)
 
     return merge_codeSmell_config(configs=[first_config, toml_config, default_codeSmell_config])
 
 def create_codeSmell_config(args):
-    return codeSmellConfig(connect=args.connect)
+    return codeSmellConfig(
+        connect=args.connect,
+        workers=args.workers,
+        metrics_port=args.metrics_port,
+        metrics_file=args.metrics_file)
+
+def start_metrics(metrics_port, metrics_file, worker=None):
+    """
+    Start the configured metrics exporters of this process.
+
+    Args:
+        metrics_port (int): Prometheus port, None to disable
+        metrics_file (str): Prometheus dump file, None to disable
+        worker (int): index of the worker process, None when running alone
+    """
+    if metrics_port is not None:
+        start_http_exporter(metrics_port + (worker or 0))
+    if metrics_file is not None:
+        if worker is not None:
+            metrics_file = "{}.{}".format(metrics_file, worker)
+        start_file_exporter(metrics_file)
+
+def run_processor(connect, verbose_level, metrics_port=None, metrics_file=None, worker=None):
+    """
+    Run one transaction processor until it is interrupted.
+
+    Args:
+        connect (str): validator endpoint
+        verbose_level (int): console logging level
+        metrics_port (int): Prometheus port, None to disable
+        metrics_file (str): Prometheus dump file, None to disable
+        worker (int): index of the worker process, None when running alone
+
+    Exits with status 1 when the processor fails, so the worker pool can
+    tell a crash from a clean exit.
+    """
+    #forked workers inherit the console handler of the pool
+    if not logging.getLogger().handlers:
+        init_console_logging(verbose_level=verbose_level)
 
-def main(args=None):
-    if args is None:
-        args = sys.argv[1:]
-    opts = parse_args(args)
     processor = None
     try:
-        #arg_config = create_codeSmell_config(opts)
-        #codeSmell_config = load_codeSmell_config(arg_config)
-        #processor = TransactionProcessor(url=codeSmell_config.connect)
-        processor = TransactionProcessor(url=opts.connect)
+        start_metrics(metrics_port, metrics_file, worker)
+
+        processor = TransactionProcessor(url=connect)
 
         """#if not toml, try loading yaml
         if log_config is None:
@@ -95,8 +150,6 @@ def main(args=None):
             log_dir=log_dir,
             name="codeSmell-" + str(processor.zmq_id)[2:-1])"""
 
-        init_console_logging(verbose_level=opts.verbose)
-
         handler = codeSmellTransactionHandler()
 
         processor.add_handler(handler)
@@ -104,8 +157,40 @@ def main(args=None):
         processor.start()
     except KeyboardInterrupt:
         pass
-    except Exception as err:  # pylint: disable=broad-except
-        print("Error: {}".format(err))
+    except Exception:  # pylint: disable=broad-except
+        LOGGER.exception("Transaction processor failed")
+        sys.exit(1)
     finally:
         if processor is not None:
             processor.stop()
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    opts = parse_args(args)
+    try:
+        arg_config = create_codeSmell_config(opts)
+        codeSmell_config = load_codeSmell_config(arg_config)
+    except Exception as err:  # pylint: disable=broad-except
+        print("Error: {}".format(err))
+        sys.exit(1)
+
+    if codeSmell_config.workers < 1:
+        print("Error: --workers must be at least 1")
+        sys.exit(1)
+
+    args = (codeSmell_config.connect,
+            opts.verbose,
+            codeSmell_config.metrics_port,
+            codeSmell_config.metrics_file)
+
+    if codeSmell_config.workers == 1:
+        run_processor(*args)
+        return
+
+    init_console_logging(verbose_level=opts.verbose)
+    pool = codeSmellWorkerPool(
+        target=run_processor,
+        args=args,
+        workers=codeSmell_config.workers)
+    pool.run()